@@ -0,0 +1,194 @@
+import gc
+import tracemalloc
+from array import array
+from typing import Any, Iterator
+
+from python.linked_list.linked_list import DoublyLinkedList
+from python.utils.benchmark import timed
+
+# index standing for "no node", like `None` for a node reference
+NIL = -1
+
+
+class ArrayDoublyLinkedList:
+    """
+    DoublyLinkedList stored as a struct of arrays instead of node objects.
+
+    Node `i` is slot `i` of four parallel arrays: `keys[i]`, `vals[i]`, and
+    the slot indices of its neighbours `next[i]` / `prev[i]` held as machine
+    ints in `array('q')` buffers. There is one Python object per list (plus
+    the keys and values themselves) rather than one per node, so the garbage
+    collector has nothing to traverse and links are 8 bytes each.
+
+    Slots freed by `remove` are pushed on the `free` stack and reused by the
+    next insertion before the arrays grow.
+    """
+
+    def __init__(self):
+        self.keys: list[Any] = []
+        self.vals: list[Any] = []
+        self.next = array('q')
+        self.prev = array('q')
+        self.free: list[int] = []
+        self.head = NIL
+        self.tail = NIL
+        self.size = 0
+
+    def __contains__(self, value: Any):
+        for val in self:
+            if val == value:
+                return True
+        return False
+
+    def __iter__(self) -> Iterator[Any]:
+        vals, nxt = self.vals, self.next
+        i = self.head
+        while i != NIL:
+            yield vals[i]
+            i = nxt[i]
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        return f'[{"->".join([str(val) for val in self])}]'
+
+    def empty(self) -> bool:
+        return self.size == 0
+
+    def append(self, key: str, value: Any):
+        i = self._alloc(key, value, NIL, self.tail)
+        if self.tail == NIL:
+            self.head = i
+        else:
+            self.next[self.tail] = i
+        self.tail = i
+
+    def prepend(self, key: str, value: Any):
+        i = self._alloc(key, value, self.head, NIL)
+        if self.head == NIL:
+            self.tail = i
+        else:
+            self.prev[self.head] = i
+        self.head = i
+
+    def remove(self, key: str) -> Any:
+        keys, nxt = self.keys, self.next
+        i = self.head
+        while i != NIL:
+            if keys[i] == key:
+                return self._release(i)
+            i = nxt[i]
+        return None
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def first(self) -> tuple[str, Any] | None:
+        return None if self.head == NIL else (self.keys[self.head], self.vals[self.head])
+
+    def last(self) -> tuple[str, Any] | None:
+        return None if self.tail == NIL else (self.keys[self.tail], self.vals[self.tail])
+
+    def reverse_list_iter(self, head: int) -> int:
+        """
+        Reverse the list starting at slot `head` (the list's head, as for
+        DoublyLinkedList). Every node's `next` is its `prev` after reversal,
+        so swapping the two arrays reverses the whole list in O(1).
+        """
+        if head != self.head:
+            raise ValueError('only the whole list, from its head, can be reversed')
+        self.next, self.prev = self.prev, self.next
+        self.head, self.tail = self.tail, self.head
+        return self.head
+
+    def _alloc(self, key: str, value: Any, next_i: int, prev_i: int) -> int:
+        """Store a node in a free slot, growing the arrays if there is none"""
+        self.size += 1
+        if self.free:
+            i = self.free.pop()
+            self.keys[i], self.vals[i] = key, value
+            self.next[i], self.prev[i] = next_i, prev_i
+            return i
+
+        self.keys.append(key)
+        self.vals.append(value)
+        self.next.append(next_i)
+        self.prev.append(prev_i)
+        return len(self.keys) - 1
+
+    def _release(self, i: int) -> Any:
+        """Unlink slot `i`, push it on the free stack and return its value"""
+        nxt, prv = self.next, self.prev
+        next_i, prev_i = nxt[i], prv[i]
+        if prev_i == NIL:
+            self.head = next_i
+        else:
+            nxt[prev_i] = next_i
+        if next_i == NIL:
+            self.tail = prev_i
+        else:
+            prv[next_i] = prev_i
+
+        val = self.vals[i]
+        # drop the references so the key and value can be freed
+        self.keys[i] = self.vals[i] = None
+        self.free.append(i)
+        self.size -= 1
+        return val
+
+
+if __name__ == '__main__':
+    soa_list = ArrayDoublyLinkedList()
+    soa_list.append('link1', 3)
+    soa_list.append('link2', 0)
+    soa_list.prepend('link0', 7)
+    print(soa_list, len(soa_list))  # [7->3->0] 3
+    print(soa_list.remove('link1'))  # 3
+    soa_list.append('link3', 5)  # reuses the slot freed by 'link1'
+    print(soa_list, soa_list.keys)  # [7->0->5] ['link3', 'link2', 'link0']
+    soa_list.reverse_list_iter(soa_list.head)
+    print(soa_list, soa_list.first(), soa_list.last())  # [5->0->7] ('link3', 5) ('link0', 7)
+    assert len(soa_list.keys) == 3
+
+    # 1M nodes: build with append, iterate, remove from the front, and time a
+    # full garbage collection while the whole list is alive. Bytes per node
+    # include the int used as both key and value.
+    n = 10 ** 6
+    for list_cls in (DoublyLinkedList, ArrayDoublyLinkedList):
+        ll = list_cls()
+
+        def append_all():
+            for i in range(n):
+                ll.append(i, i)
+
+        def remove_all():
+            for i in range(n):
+                ll.remove(i)
+
+        # the previous list's doubly linked nodes are reference cycles: free
+        # them first so the timed collection below only traverses this list
+        gc.collect()
+        t_append = timed(append_all)
+        t_iter = timed(lambda: sum(ll))
+        t_gc = timed(gc.collect)
+        t_remove = timed(remove_all)
+        ll = list_cls()
+        tracemalloc.start()
+        append_all()
+        per_node = tracemalloc.get_traced_memory()[0] / n
+        tracemalloc.stop()
+        del ll
+
+        print(f'{list_cls.__name__:22} {per_node:5.1f} bytes per node, '
+              f'append {n / t_append:11,.0f}/s, iterate {n / t_iter:12,.0f}/s, '
+              f'remove {n / t_remove:11,.0f}/s, gc.collect {t_gc * 1000:6.1f} ms')
+
+    # DoublyLinkedList        96.0 bytes per node, append   2,351,452/s, iterate   22,752,538/s, remove   2,438,235/s, gc.collect  120.3 ms
+    # ArrayDoublyLinkedList   65.3 bytes per node, append   1,803,106/s, iterate   12,389,882/s, remove   2,018,282/s, gc.collect   23.7 ms
+    #
+    # The arrays save a third of the memory and a full collection no longer
+    # walks a million nodes. In CPython, however, every read from an
+    # `array('q')` boxes the index into an int object, so following links is
+    # slower than following object references: this layout pays off for GC
+    # pauses and memory, not for raw traversal speed.
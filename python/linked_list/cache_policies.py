@@ -0,0 +1,372 @@
+import sys
+from bisect import bisect
+from dataclasses import dataclass, field
+from itertools import accumulate
+from random import Random
+from typing import Any, Hashable
+
+from python.linked_list.lru_cache import LRUCache, LRUDoublyLinkedList, LRUDoublyNode
+
+
+class LFUNode(LRUDoublyNode):
+    __slots__ = ('freq',)
+
+    def __init__(self, key: Hashable = None, val: Any = None):
+        super().__init__(key, val)
+        self.freq = 1
+
+
+class SegmentNode(LRUDoublyNode):
+    __slots__ = ('segment',)
+
+    def __init__(
+        self,
+        key: Hashable = None,
+        val: Any = None,
+        segment: LRUDoublyLinkedList | None = None
+    ):
+        super().__init__(key, val)
+        # the list of the cache this node is currently linked into
+        self.segment = segment
+
+    def move_to(self, segment: LRUDoublyLinkedList) -> None:
+        """Unlink from the current segment and append to the end of `segment`"""
+        assert self.segment is not None
+        self.segment.remove(self)
+        segment.append(self)
+        self.segment = segment
+
+
+@dataclass
+class CountPolicyCache(LRUCache):
+    """
+    Base for the alternative eviction policies. They evict by key count only:
+    `ttl` and `max_bytes` are LRUCache options.
+    """
+
+    def __post_init__(self) -> None:
+        if self.ttl is not None or self.max_bytes is not None:
+            raise ValueError(f'{self.__class__.__name__} does not support ttl or max_bytes')
+
+    def _reject_ttl(self, ttl: float | None) -> None:
+        # `put` keeps LRUCache's signature, so callers passing ttl= get a
+        # clear error rather than a TypeError
+        if ttl is not None:
+            raise ValueError(f'{self.__class__.__name__} does not support ttl')
+
+
+@dataclass
+class LFUCache(CountPolicyCache):
+    """
+    Least Frequently Used: evicts the key with the fewest uses, the least
+    recently used one among ties. Keys are kept in one LRUDoublyLinkedList per
+    use count and `min_freq` tracks the lowest count, so get/put are O(1).
+    """
+
+    freqs: dict[int, LRUDoublyLinkedList] = field(default_factory=dict)
+    min_freq = 0
+
+    def get(self, key, default: Any = None):
+        node = self.cache.get(key)
+        if node is None:
+            self.miss += 1
+            return default
+
+        self.hits += 1
+        self._bump(node)
+        return node.val
+
+    def put(self, key, value, ttl: float | None = None) -> None:
+        self._reject_ttl(ttl)
+        node = self.cache.get(key)
+        if node is not None:
+            node.val = value
+            self._bump(node)
+            return
+
+        if self.num_keys >= self.capacity:
+            self._evict()
+        node = LFUNode(key, value)
+        self._link(node)
+        self.cache[key] = node
+        self.num_keys += 1
+        self.min_freq = 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.freqs = {}
+        self.min_freq = 0
+
+    def _link(self, node: LFUNode) -> None:
+        if node.freq not in self.freqs:
+            self.freqs[node.freq] = LRUDoublyLinkedList()
+        self.freqs[node.freq].append(node)
+
+    def _bump(self, node: LFUNode) -> None:
+        bucket = self.freqs[node.freq]
+        bucket.remove(node)
+        if bucket.empty():
+            del self.freqs[node.freq]
+            if self.min_freq == node.freq:
+                self.min_freq += 1
+        node.freq += 1
+        self._link(node)
+
+    def _evict(self) -> None:
+        bucket = self.freqs[self.min_freq]
+        node = bucket.pop_first()
+        assert node is not None  # empty buckets are always deleted
+        if bucket.empty():
+            del self.freqs[self.min_freq]
+        del self.cache[node.key]
+        self.num_keys -= 1
+
+
+@dataclass
+class SLRUCache(CountPolicyCache):
+    """
+    Segmented LRU: new keys enter the probationary segment (`list`) and move
+    to the protected segment on their first hit. The protected segment holds
+    at most `protected_ratio` of the capacity, demoting its least recently
+    used keys back to probation, and evictions come from probation. A burst
+    of one-off keys (e.g. a scan) therefore cannot flush the keys in use.
+    """
+
+    protected_ratio: float = 0.8
+    protected: LRUDoublyLinkedList = field(default_factory=LRUDoublyLinkedList)
+
+    def get(self, key, default: Any = None):
+        node = self.cache.get(key)
+        if node is None:
+            self.miss += 1
+            return default
+
+        self.hits += 1
+        self._promote(node)
+        return node.val
+
+    def put(self, key, value, ttl: float | None = None) -> None:
+        self._reject_ttl(ttl)
+        node = self.cache.get(key)
+        if node is not None:
+            node.val = value
+            self._promote(node)
+            return
+
+        if self.num_keys >= self.capacity:
+            self._evict()
+        node = SegmentNode(key, value, self.list)
+        self.list.append(node)
+        self.cache[key] = node
+        self.num_keys += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.protected = LRUDoublyLinkedList()
+
+    def _promote(self, node: SegmentNode) -> None:
+        node.move_to(self.protected)
+        if self.protected.size > int(self.capacity * self.protected_ratio):
+            demoted = self.protected.head.next
+            assert isinstance(demoted, SegmentNode)
+            demoted.move_to(self.list)
+
+    def _evict(self) -> None:
+        node = self.list.pop_first() or self.protected.pop_first()
+        assert node is not None
+        del self.cache[node.key]
+        self.num_keys -= 1
+
+
+@dataclass
+class ARCCache(CountPolicyCache):
+    """
+    Adaptive Replacement Cache (Megiddo & Modha). Cached keys are split between
+    `list` (T1, seen once recently) and `t2` (T2, seen at least twice). The
+    ghost lists `b1`/`b2` remember the keys recently evicted from T1/T2,
+    without their values. A miss on a ghost key shows which list was evicted
+    from too eagerly, and moves the target size `p` of T1 towards it: ARC
+    adapts between recency (LRU) and frequency (LFU) on its own.
+    """
+
+    t2: LRUDoublyLinkedList = field(default_factory=LRUDoublyLinkedList)
+    b1: LRUDoublyLinkedList = field(default_factory=LRUDoublyLinkedList)
+    b2: LRUDoublyLinkedList = field(default_factory=LRUDoublyLinkedList)
+    ghosts: dict[Hashable, SegmentNode] = field(default_factory=dict)
+    p: float = 0
+
+    def get(self, key, default: Any = None):
+        node = self.cache.get(key)
+        if node is None:
+            self.miss += 1
+            return default
+
+        self.hits += 1
+        node.move_to(self.t2)
+        return node.val
+
+    def put(self, key, value, ttl: float | None = None) -> None:
+        self._reject_ttl(ttl)
+        node = self.cache.get(key)
+        if node is not None:
+            node.val = value
+            node.move_to(self.t2)
+            return
+
+        c = self.capacity
+        ghost = self.ghosts.pop(key, None)
+        if ghost is not None:
+            # the key was evicted too early: grow the side that lost it
+            in_b2 = ghost.segment is self.b2
+            if in_b2:
+                self.p = max(0, self.p - max(self.b1.size / self.b2.size, 1))
+            else:
+                self.p = min(c, self.p + max(self.b2.size / self.b1.size, 1))
+            self._replace(in_b2)
+            ghost.val = value
+            ghost.move_to(self.t2)
+            self.cache[key] = ghost
+            self.num_keys += 1
+            return
+
+        t1_b1 = self.list.size + self.b1.size
+        if t1_b1 >= c:
+            if self.list.size < c:
+                self._drop_ghost(self.b1)
+                self._replace(False)
+            else:
+                # T1 alone fills the cache: its oldest key is dropped for good
+                oldest = self.list.pop_first()
+                assert oldest is not None
+                del self.cache[oldest.key]
+                self.num_keys -= 1
+        else:
+            total = t1_b1 + self.t2.size + self.b2.size
+            if total >= c:
+                if total >= 2 * c:
+                    self._drop_ghost(self.b2)
+                self._replace(False)
+
+        node = SegmentNode(key, value, self.list)
+        self.list.append(node)
+        self.cache[key] = node
+        self.num_keys += 1
+
+    def clear(self) -> None:
+        super().clear()
+        self.t2 = LRUDoublyLinkedList()
+        self.b1 = LRUDoublyLinkedList()
+        self.b2 = LRUDoublyLinkedList()
+        self.ghosts = {}
+        self.p = 0
+
+    def _replace(self, in_b2: bool) -> None:
+        """
+        Make room for one key by evicting from T1 when it is over its target
+        size `p` (else from T2), remembering the evicted key as a ghost
+        """
+
+        if self.num_keys < self.capacity:
+            return
+
+        t1 = self.list
+        if t1.size and (t1.size > self.p or (in_b2 and t1.size == self.p) or self.t2.empty()):
+            node, ghosts = t1.pop_first(), self.b1
+        else:
+            node, ghosts = self.t2.pop_first(), self.b2
+        assert isinstance(node, SegmentNode)
+
+        del self.cache[node.key]
+        self.num_keys -= 1
+        node.val = None
+        ghosts.append(node)
+        node.segment = ghosts
+        self.ghosts[node.key] = node
+
+    def _drop_ghost(self, ghosts: LRUDoublyLinkedList) -> None:
+        node = ghosts.pop_first()
+        if node is not None:
+            del self.ghosts[node.key]
+
+
+if __name__ == '__main__':
+    lfu = LFUCache(2)
+    lfu.put('a', 1)
+    lfu.put('b', 2)
+    lfu.get('a')
+    lfu.put('c', 3)  # evicts 'b': used once, 'a' was used twice
+    print(sorted(lfu.cache))  # ['a', 'c']
+
+    slru = SLRUCache(4)
+    for key in 'abcd':
+        slru.put(key, key)
+    slru.get('a')
+    for key in 'wxyz':  # a scan of one-off keys
+        slru.put(key, key)
+    print('a' in slru, 'b' in slru)  # True False
+
+    arc = ARCCache(2)
+    arc.put('a', 1)
+    arc.put('b', 2)
+    arc.get('a')  # 'a' moves to T2
+    arc.put('c', 3)  # 'b' is evicted from T1 and remembered in B1
+    arc.put('b', 2)  # ghost hit: T1's target size p grows, 'a' goes to B2
+    print(sorted(arc.cache), sorted(arc.ghosts), arc.p)  # ['b', 'c'] ['a'] 1
+
+    # same put signature as LRUCache, but ttl is an LRUCache option
+    try:
+        arc.put('d', 4, ttl=5)
+    except ValueError as e:
+        print(e)  # ARCCache does not support ttl
+
+    def replay(cache: LRUCache, trace: list) -> float:
+        missing = object()
+        for key in trace:
+            if cache.get(key, missing) is missing:
+                cache.put(key, key)
+        return cache.hit_ratio
+
+    def zipf_trace(rng: Random, n: int, keys: int, s: float = 1.0) -> list[int]:
+        cum_weights = list(accumulate(1 / (k ** s) for k in range(1, keys + 1)))
+        total = cum_weights[-1]
+        return [bisect(cum_weights, rng.random() * total) for _ in range(n)]
+
+    rng = Random(7)
+    capacity = 1000
+    traces = {'zipf': zipf_trace(rng, 200_000, 20_000)}
+
+    # the same popular keys, interrupted by scans over keys never seen again
+    scans, next_key = [], 10 ** 9
+    for i, key in enumerate(zipf_trace(rng, 200_000, 20_000)):
+        scans.append(key)
+        if i % 10_000 == 0:
+            scans.extend(range(next_key, next_key + 2 * capacity))
+            next_key += 2 * capacity
+    traces['zipf + scans'] = scans
+
+    # a loop slightly larger than the cache: the worst case for LRU
+    traces['loop'] = list(range(int(capacity * 1.2))) * 100
+
+    # recorded traces: one key per line, e.g. `python -m ... trace.txt`
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            traces[path] = [line.strip() for line in f if line.strip()]
+
+    for name, trace in traces.items():
+        print(f'{name} ({len(trace)} requests, capacity {capacity})')
+        for cache_cls in (LRUCache, LFUCache, SLRUCache, ARCCache):
+            ratio = replay(cache_cls(capacity), trace)
+            print(f'    {cache_cls.__name__:10} hit ratio -- {ratio:.4f}')
+
+    # zipf (200000 requests, capacity 1000)
+    #     LRUCache   hit ratio -- 0.6131
+    #     LFUCache   hit ratio -- 0.6802
+    #     SLRUCache  hit ratio -- 0.6799
+    #     ARCCache   hit ratio -- 0.6802
+    # zipf + scans (240000 requests, capacity 1000)
+    #     LRUCache   hit ratio -- 0.4963
+    #     LFUCache   hit ratio -- 0.5674
+    #     SLRUCache  hit ratio -- 0.5678
+    #     ARCCache   hit ratio -- 0.5683
+    # loop (120000 requests, capacity 1000)
+    #     (0.0000 for all four: every key is evicted just before it comes back)
@@ -1,6 +1,11 @@
+import tracemalloc
 from typing import Any, Self
 
 class SinglyNode:
+    # no per-instance __dict__: a node only ever holds these attributes, and
+    # the lists, stacks, queues and caches create one node per element
+    __slots__ = ('key', 'val', 'next')
+
     def __init__(self, key: str | None = None, val: Any = None, next: Self | None = None):
         self.key = key
         self.val = val
@@ -11,6 +16,8 @@ class SinglyNode:
 
 
 class DoublyNode(SinglyNode):
+    __slots__ = ('prev',)
+
     def __init__(
         self,
         key: str | None = None,
@@ -20,3 +27,54 @@ class DoublyNode(SinglyNode):
     ):
         super().__init__(key, val, next)
         self.prev = prev
+
+
+if __name__ == '__main__':
+    from python.trees.tree_node import TreeNode
+
+    def singly_chain(n: int) -> SinglyNode:
+        head = None
+        for i in range(n):
+            head = SinglyNode(None, i, head)
+        return head
+
+    def doubly_chain(n: int) -> DoublyNode:
+        head = None
+        for i in range(n):
+            node = DoublyNode(None, i, head)
+            if head is not None:
+                head.prev = node
+            head = node
+        return head
+
+    def complete_tree(n: int) -> TreeNode:
+        nodes = [TreeNode(i) for i in range(n)]
+        for i, node in enumerate(nodes):
+            if 2 * i + 1 < n:
+                node.left = nodes[2 * i + 1]
+            if 2 * i + 2 < n:
+                node.right = nodes[2 * i + 2]
+        root = nodes[0]
+        nodes.clear()
+        return root
+
+    # bytes per node of 1M-node structures, each node's int payload (32
+    # bytes as allocated) included
+    n = 10 ** 6
+    for build in (singly_chain, doubly_chain, complete_tree):
+        tracemalloc.start()
+        structure = build(n)
+        per_node = tracemalloc.get_traced_memory()[0] / n
+        tracemalloc.stop()
+        del structure
+        print(f'{build.__name__:14} {per_node:6.1f} bytes per node')
+
+    # with a per-instance __dict__, before __slots__:
+    # singly_chain    128.0 bytes per node
+    # doubly_chain    136.0 bytes per node
+    # complete_tree   128.0 bytes per node
+    #
+    # slotted:
+    # singly_chain     88.0 bytes per node
+    # doubly_chain     96.0 bytes per node
+    # complete_tree    88.0 bytes per node
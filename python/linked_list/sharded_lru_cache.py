@@ -0,0 +1,236 @@
+import asyncio
+import sys
+import time
+from collections.abc import Callable
+from random import Random
+from threading import Lock, Thread
+from typing import Any, ClassVar, Self
+
+from python.linked_list.lru_cache import LRUCache
+
+
+class ShardedLRUCache:
+    """
+    Thread-safe LRU Cache. Keys are split by hash over `shards` independent
+    LRUCache instances, each guarded by its own lock: threads only wait on
+    each other when their keys land on the same shard.
+
+    The capacity (and `max_bytes`, if given) is divided between the shards,
+    `capacity % shards` of them getting one slot more than the others so the
+    total is exactly `capacity`, and each shard evicts its own least recently
+    used key: eviction order is LRU per shard rather than globally. `ttl`,
+    `sizeof` and `clock` are passed on to every shard. Hit and miss counts
+    are kept per shard (`shards[i].hits`) and summed for the whole cache
+    (`hits`).
+    """
+
+    # class variable to map the decorator functions to their respective instance
+    decorator_function_to_instance_map: ClassVar[dict[Callable, Self]] = {}
+
+    # the decorators only use get/put/clear and the statistics below
+    decorator = classmethod(LRUCache.decorator.__func__)
+    async_decorator = classmethod(LRUCache.async_decorator.__func__)
+
+    def __init__(
+        self,
+        capacity: int,
+        shards: int = 8,
+        ttl: float | None = None,
+        max_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if shards < 1:
+            raise ValueError('shards should be a positive integer')
+        if shards > capacity:
+            raise ValueError('shards should not exceed capacity')
+
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # calls that waited on an identical in-flight call (`async_decorator`)
+        self.coalesced = 0
+        shard_capacity, extra = divmod(capacity, shards)
+        if max_bytes is None:
+            shard_bytes = [None] * shards
+        else:
+            shard_max_bytes, extra_bytes = divmod(max_bytes, shards)
+            shard_bytes = [shard_max_bytes + (i < extra_bytes) for i in range(shards)]
+        self.shards = [
+            LRUCache(
+                shard_capacity + (i < extra), ttl=ttl, max_bytes=shard_bytes[i],
+                sizeof=sizeof, clock=clock
+            )
+            for i in range(shards)
+        ]
+        self.locks = [Lock() for _ in range(shards)]
+
+    def __repr__(self) -> str:
+        """
+        Return the details for the cache instance [hits, misses, capacity, current_size]
+        """
+
+        return (
+            f'CacheInfo(hits={self.hits}, misses={self.miss}, '
+            f'capacity={self.capacity}, current size={self.num_keys})'
+        )
+
+    def __contains__(self, key) -> bool:
+        idx = self._shard(key)
+        with self.locks[idx]:
+            return key in self.shards[idx]
+
+    @property
+    def hits(self) -> int:
+        return sum(shard.hits for shard in self.shards)
+
+    @property
+    def miss(self) -> int:
+        return sum(shard.miss for shard in self.shards)
+
+    @property
+    def expired(self) -> int:
+        return sum(shard.expired for shard in self.shards)
+
+    @property
+    def num_keys(self) -> int:
+        return sum(shard.num_keys for shard in self.shards)
+
+    @property
+    def num_bytes(self) -> int:
+        return sum(shard.num_bytes for shard in self.shards)
+
+    @property
+    def hit_ratio(self) -> float:
+        hits, miss = self.hits, self.miss
+        return hits / (hits + miss) if hits + miss else 0.0
+
+    def _shard(self, key) -> int:
+        return hash(key) % len(self.shards)
+
+    def get(self, key, default: Any = None):
+        """
+        Returns the value for the input key from its shard, under that shard's
+        lock. Returns `default` (None) if key is not present in cache or has
+        expired
+        """
+
+        idx = self._shard(key)
+        with self.locks[idx]:
+            return self.shards[idx].get(key, default)
+
+    def put(self, key, value, ttl: float | None = None) -> None:
+        """
+        Sets the value for the input key in its shard, under that shard's lock.
+        `ttl` overrides the cache's default time to live for this entry.
+        """
+
+        idx = self._shard(key)
+        with self.locks[idx]:
+            self.shards[idx].put(key, value, ttl)
+
+    def clear(self) -> None:
+        """
+        Empties every shard and resets the statistics
+        """
+
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.clear()
+        self.coalesced = 0
+
+
+if __name__ == '__main__':
+    cache = ShardedLRUCache(4, shards=2)
+    for i in range(6):
+        cache.put(i, i * i)
+    print(cache.get(5))  # 25
+    print(cache.get(0))  # None
+    print(repr(cache))  # CacheInfo(hits=1, misses=1, capacity=4, current size=4)
+    print([repr(shard) for shard in cache.shards])
+    # ['CacheInfo(hits=0, misses=1, capacity=2, current size=2)',
+    #  'CacheInfo(hits=1, misses=0, capacity=2, current size=2)']
+
+    # the capacity is split exactly: no more than 10 keys in total
+    cache = ShardedLRUCache(10, shards=4)
+    print([shard.capacity for shard in cache.shards])  # [3, 3, 2, 2]
+    for i in range(100):
+        cache.put(i, i)
+    assert cache.num_keys <= 10
+    print(cache == cache, cache == ShardedLRUCache(10, shards=4))  # True False
+    try:
+        ShardedLRUCache(4, shards=8)
+    except ValueError as e:
+        print(e)  # shards should not exceed capacity
+
+    @ShardedLRUCache.decorator(100, shards=4)
+    def fib(num):
+        if num in (1, 2):
+            return 1
+        return fib(num - 1) + fib(num - 2)
+
+    print(fib(50))  # 12586269025
+    fib.cache_clear()
+    print(fib.cache_info())  # CacheInfo(hits=0, misses=0, capacity=100, current size=0)
+
+    # ttl and max_bytes reach every shard; max_bytes is split like capacity
+    now = 0.0
+    ttl_cache = ShardedLRUCache(8, shards=2, ttl=30, max_bytes=100, sizeof=len, clock=lambda: now)
+    print([shard.max_bytes for shard in ttl_cache.shards])  # [50, 50]
+    ttl_cache.put('session', 'abc')
+    ttl_cache.put('token', 'xyz', ttl=5)
+    now = 10.0
+    print(ttl_cache.get('session'), ttl_cache.get('token'))  # abc None
+    print(ttl_cache.expired, ttl_cache.num_bytes)  # 1 3
+
+    @ShardedLRUCache.async_decorator(16, shards=4)
+    async def fetch(key):
+        await asyncio.sleep(0.01)
+        return key * 2
+
+    async def fetch_all() -> list:
+        return await asyncio.gather(*(fetch(1) for _ in range(5)))
+
+    print(asyncio.run(fetch_all()), fetch.cache_info().coalesced)  # [2, 2, 2, 2, 2] 4
+    fetch.cache_clear()
+    print(fetch.cache_info().coalesced)  # 0
+
+    # 8 worker threads share one cache; every shard's dict and recency list
+    # must still agree once they are done
+    def worker(cache: ShardedLRUCache, seed: int, ops: int) -> None:
+        rng = Random(seed)
+        for _ in range(ops):
+            key = rng.randrange(2048)
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    ops, num_threads = 50_000, 8
+    for shards in (1, 2, 4, 8, 16):
+        cache = ShardedLRUCache(1024, shards=shards)
+        threads = [Thread(target=worker, args=(cache, seed, ops)) for seed in range(num_threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        for shard in cache.shards:
+            in_list, node = 0, shard.list.head.next
+            while node is not shard.list.tail:
+                in_list, node = in_list + 1, node.next
+            assert in_list == len(shard.cache) == shard.num_keys
+
+        throughput = ops * num_threads / elapsed
+        print(f'shards={shards:<3} -- {throughput:,.0f} ops/sec, {cache!r}')
+
+    # with the GIL only one thread runs Python code at a time, so on a
+    # standard build more shards only remove lock contention and throughput
+    # stays flat; the shard count pays off on free-threaded builds, where
+    # threads on different shards run in parallel.
+    #
+    # shards=1   -- 584,151 ops/sec, CacheInfo(hits=199594, misses=200406, capacity=1024, current size=1024)
+    # shards=2   -- 622,868 ops/sec, CacheInfo(hits=199906, misses=200094, capacity=1024, current size=1024)
+    # shards=4   -- 614,992 ops/sec, CacheInfo(hits=199485, misses=200515, capacity=1024, current size=1024)
+    # shards=8   -- 606,492 ops/sec, CacheInfo(hits=199502, misses=200498, capacity=1024, current size=1024)
+    # shards=16  -- 579,402 ops/sec, CacheInfo(hits=199352, misses=200648, capacity=1024, current size=1024)
@@ -0,0 +1,234 @@
+from bisect import bisect_left, insort
+from random import Random
+from typing import Any, Iterator
+
+from python.linked_list.linked_list import SinglyLinkedList
+from python.linked_list.node import SinglyNode
+from python.utils.benchmark import timed
+
+
+class SkipNode(SinglyNode):
+    """
+    SinglyNode with a tower of forward pointers: `forward[i]` is the next node
+    on level i, and `width[i]` the number of level 0 steps it skips over.
+    `next` is always `forward[0]`, so level 0 reads like a SinglyLinkedList.
+    """
+
+    __slots__ = ('forward', 'width')
+
+    def __init__(self, key: Any = None, val: Any = None, level: int = 1):
+        super().__init__(key, val)
+        self.forward: list[SkipNode | None] = [None] * level
+        self.width = [1] * level
+
+
+class SkipList:
+    """
+    Sorted container of (key, value) pairs. Every node is on level 0, and each
+    level up holds a random half of the level below, so a search skips ahead
+    on the top levels and descends: insert, remove, search and rank are
+    expected O(log n). Equal keys are kept in insertion order.
+
+    The widths of the links let `rank` count the keys it skips without
+    walking them. Pass `seed` for a reproducible layout of the levels.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.5
+
+    def __init__(self, seed: int | None = None):
+        self.rng = Random(seed)
+        # sentinel in front of the first node, as tall as the tallest tower.
+        # Links to None count the steps to one past the last node; levels
+        # above `level` are reset when they come into use
+        self.head = SkipNode(None, None, self.MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    def __contains__(self, key: Any) -> bool:
+        return self.search(key) is not None
+
+    def __iter__(self) -> Iterator[Any]:
+        curr = self.head.next
+        while curr:
+            yield curr.key
+            curr = curr.next
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __str__(self) -> str:
+        return f'[{"->".join([str(key) for key in self])}]'
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        curr = self.head.next
+        while curr:
+            yield curr.key, curr.val
+            curr = curr.next
+
+    def insert(self, key: Any, value: Any = None) -> None:
+        update, ranks = self._path(key, after_equal=True)
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                update[i], ranks[i] = self.head, 0
+                self.head.width[i] = self.size + 1
+            self.level = level
+
+        node = SkipNode(key, value, level)
+        rank = ranks[0] + 1
+        for i in range(level):
+            prev = update[i]
+            node.forward[i], prev.forward[i] = prev.forward[i], node
+            # split prev's link in two around the new node
+            skipped = rank - ranks[i]
+            node.width[i] = prev.width[i] - skipped + 1
+            prev.width[i] = skipped
+        for i in range(level, self.level):
+            update[i].width[i] += 1
+
+        update[0].next, node.next = node, node.forward[0]
+        self.size += 1
+
+    def remove(self, key: Any) -> Any:
+        """remove the first node with key and return its value"""
+        update, _ = self._path(key)
+        node = update[0].forward[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for i in range(self.level):
+            prev = update[i]
+            if prev.forward[i] is node:
+                prev.forward[i] = node.forward[i]
+                prev.width[i] += node.width[i] - 1
+            else:
+                prev.width[i] -= 1
+        update[0].next = update[0].forward[0]
+
+        while self.level > 1 and self.head.forward[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return node.val
+
+    def search(self, key: Any) -> SkipNode | None:
+        """the first node with key, or None"""
+        curr = self.head
+        for i in reversed(range(self.level)):
+            nxt = curr.forward[i]
+            while nxt is not None and nxt.key < key:
+                curr, nxt = nxt, nxt.forward[i]
+        curr = curr.forward[0]
+        return curr if curr is not None and curr.key == key else None
+
+    def rank(self, key: Any) -> int:
+        """the number of keys less than key, i.e. the index key would be inserted at"""
+        return self._path(key)[1][0]
+
+    def irange(self, lo: Any = None, hi: Any = None) -> Iterator[Any]:
+        """yield the keys from lo to hi, both included, in order. None is unbounded"""
+        if lo is None:
+            curr = self.head.next
+        else:
+            curr = self._path(lo)[0][0].forward[0]
+        while curr is not None and (hi is None or curr.key <= hi):
+            yield curr.key
+            curr = curr.next
+
+    def _path(self, key: Any, after_equal: bool = False) -> tuple[list, list[int]]:
+        """
+        For each level, the last node before key (or after the keys equal to
+        it) and that node's rank, counting the head as 0.
+        """
+        update: list[SkipNode | None] = [None] * self.MAX_LEVEL
+        ranks = [0] * self.MAX_LEVEL
+        curr, rank = self.head, 0
+        for i in reversed(range(self.level)):
+            nxt = curr.forward[i]
+            if after_equal:
+                while nxt is not None and nxt.key <= key:
+                    rank += curr.width[i]
+                    curr, nxt = nxt, nxt.forward[i]
+            else:
+                while nxt is not None and nxt.key < key:
+                    rank += curr.width[i]
+                    curr, nxt = nxt, nxt.forward[i]
+            update[i], ranks[i] = curr, rank
+        return update, ranks
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self.rng.random() < self.P:
+            level += 1
+        return level
+
+
+if __name__ == '__main__':
+    skip_list = SkipList(seed=7)
+    for key in (5, 1, 9, 3, 7, 3):
+        skip_list.insert(key, str(key))
+    print(skip_list, len(skip_list))  # [1->3->3->5->7->9] 6
+    print(skip_list.search(7), skip_list.search(4))  # 7: 7 None
+    print(skip_list.rank(5), skip_list.rank(4), skip_list.rank(100))  # 3 3 6
+    print(list(skip_list.irange(3, 7)))  # [3, 3, 5, 7]
+    print(skip_list.remove(3), skip_list)  # 3 [1->3->5->7->9]
+
+    # the same seed builds the same towers
+    towers = []
+    for _ in range(2):
+        sl = SkipList(seed=42)
+        for key in range(1000):
+            sl.insert(key)
+        towers.append([len(sl.search(key).forward) for key in range(1000)])
+    assert towers[0] == towers[1]
+
+    # n random keys: build the container, then look every key up. insort
+    # moves half the list on every insert, O(n^2) overall, so it is skipped
+    # for 10^6 keys, and the linked list scan is O(n) per lookup, so it only
+    # looks up 1000 keys of the smallest list.
+    def per_op(t: float, ops: int) -> str:
+        return f'{t / ops * 1e6:.2f} us'
+
+    rng = Random(0)
+    for n in (10 ** 4, 10 ** 5, 10 ** 6):
+        keys = [rng.random() for _ in range(n)]
+
+        def build_skip_list():
+            sl = SkipList(seed=0)
+            for key in keys:
+                sl.insert(key)
+            return sl
+
+        def build_sorted_list():
+            arr = []
+            for key in keys:
+                insort(arr, key)
+            return arr
+
+        sl = build_skip_list()
+        arr = sorted(keys)
+        results = {
+            'SkipList.insert': timed(build_skip_list),
+            'insort': timed(build_sorted_list) if n < 10 ** 6 else None,
+            'SkipList.search': timed(lambda: [sl.search(key) for key in keys]),
+            'bisect_left': timed(lambda: [bisect_left(arr, key) for key in keys]),
+        }
+        if n == 10 ** 4:
+            ll = SinglyLinkedList()
+            ll.extend((key, key) for key in arr)
+            t = timed(lambda: [ll.search_val(key) for key in keys[:1000]])
+            results['search_val'] = t * n / 1000
+
+        print(f'n={n:<8}', ', '.join(
+            f'{name} {per_op(t, n)}' for name, t in results.items() if t is not None
+        ))
+
+    # n=10000    SkipList.insert 5.65 us, insort 0.73 us, SkipList.search 2.66 us, bisect_left 0.32 us, search_val 370.73 us
+    # n=100000   SkipList.insert 9.55 us, insort 6.43 us, SkipList.search 5.78 us, bisect_left 0.53 us
+    # n=1000000  SkipList.insert 18.11 us, SkipList.search 12.04 us, bisect_left 1.61 us
+    #
+    # bisect runs its O(log n) search in C, so a Python skip list cannot beat
+    # it on lookups. insort's memmove grows with n, though: the skip list
+    # catches up on inserts around 10^5 keys and keeps O(log n) inserts and
+    # removals beyond that, where insort (about 200 us per insert at 10^6
+    # keys) does not.
@@ -0,0 +1,260 @@
+import tracemalloc
+from collections import deque
+from typing import Any, Iterator
+
+from python.queue.deque import Deque
+from python.utils.benchmark import timed
+
+# values per block: a power of two, so a position splits into block and slot
+# with a shift and a mask
+BLOCK_SHIFT = 6
+BLOCK_SIZE = 1 << BLOCK_SHIFT
+BLOCK_MASK = BLOCK_SIZE - 1
+
+
+class ArrayDeque:
+    """
+    Deque stored in fixed size blocks (arrays of 64 values) like CPython's
+    `collections.deque`, instead of a DoublyNode per value.
+
+    The blocks in use are kept in order in `blocks`, itself a ring buffer of
+    block references: `head` is the index of the first block in it and
+    `start` the slot of the first value in that block. Value i is therefore
+    at position `start + i` of the blocks laid end to end, which makes
+    indexing O(1) where a linked deque has to walk to the value. Adding at
+    either end fills the end block or links a new one, and a block is
+    dropped as soon as it is emptied, both in O(1) (amortized when the ring
+    of blocks has to grow).
+
+    With `maxlen`, adding to a full deque drops a value from the other end.
+
+    Unlike Deque, which keeps a `key` on every node, the blocks hold values
+    only: `add_first`, `add_last` and `enqueue` take the value alone rather
+    than `(key, value)`, so callers of Deque that pass keys need changing.
+    """
+
+    def __init__(self, maxlen: int | None = None):
+        if maxlen is not None and maxlen < 0:
+            raise ValueError('maxlen should be a non-negative integer')
+
+        self.maxlen = maxlen
+        self.blocks: list[list | None] = [None] * 8
+        self.head = 0
+        self.nblocks = 0
+        self.start = 0
+        self.size = 0
+
+    def __getitem__(self, i: int) -> Any:
+        block, slot = self._locate(i)
+        return block[slot]
+
+    def __setitem__(self, i: int, value: Any) -> None:
+        block, slot = self._locate(i)
+        block[slot] = value
+
+    def __iter__(self) -> Iterator[Any]:
+        blocks, mask = self.blocks, len(self.blocks) - 1
+        for pos in range(self.start, self.start + self.size):
+            yield blocks[(self.head + (pos >> BLOCK_SHIFT)) & mask][pos & BLOCK_MASK]
+
+    def __len__(self):
+        return self.size
+
+    def __reversed__(self) -> Iterator[Any]:
+        blocks, mask = self.blocks, len(self.blocks) - 1
+        for pos in reversed(range(self.start, self.start + self.size)):
+            yield blocks[(self.head + (pos >> BLOCK_SHIFT)) & mask][pos & BLOCK_MASK]
+
+    def __str__(self):
+        return f'[{"->".join(str(value) for value in self)}]'
+
+    def empty(self) -> bool:
+        return self.size == 0
+
+    def add_first(self, value: Any) -> None:
+        """prepend value to the head of the deque (no key, unlike Deque)"""
+        if self.maxlen == 0:
+            return
+        if self.start == 0:
+            if self.nblocks == len(self.blocks):
+                self._grow()
+            self.head = (self.head - 1) & (len(self.blocks) - 1)
+            self.blocks[self.head] = [None] * BLOCK_SIZE
+            self.nblocks += 1
+            self.start = BLOCK_SIZE
+        self.start -= 1
+        self.blocks[self.head][self.start] = value
+        self.size += 1
+        if self.maxlen is not None and self.size > self.maxlen:
+            self.delete_last()
+
+    def add_last(self, value: Any) -> None:
+        """append value to the tail of the deque (no key, unlike Deque)"""
+        if self.maxlen == 0:
+            return
+        pos = self.start + self.size
+        if pos == self.nblocks << BLOCK_SHIFT:
+            if self.nblocks == len(self.blocks):
+                self._grow()
+            self.blocks[(self.head + self.nblocks) & (len(self.blocks) - 1)] = [None] * BLOCK_SIZE
+            self.nblocks += 1
+        self.blocks[(self.head + (pos >> BLOCK_SHIFT)) & (len(self.blocks) - 1)][pos & BLOCK_MASK] = value
+        self.size += 1
+        if self.maxlen is not None and self.size > self.maxlen:
+            self.delete_first()
+
+    enqueue = add_last
+
+    def delete_first(self) -> Any:
+        if not self.size:
+            raise IndexError('pop from an empty deque')
+
+        block = self.blocks[self.head]
+        value, block[self.start] = block[self.start], None
+        self.start += 1
+        self.size -= 1
+        if self.start == BLOCK_SIZE:
+            self.blocks[self.head] = None
+            self.head = (self.head + 1) & (len(self.blocks) - 1)
+            self.nblocks -= 1
+            self.start = 0
+        return value
+
+    dequeue = delete_first
+
+    def delete_last(self) -> Any:
+        if not self.size:
+            raise IndexError('pop from an empty deque')
+
+        self.size -= 1
+        pos = self.start + self.size
+        mask = len(self.blocks) - 1
+        block = self.blocks[(self.head + (pos >> BLOCK_SHIFT)) & mask]
+        value, block[pos & BLOCK_MASK] = block[pos & BLOCK_MASK], None
+        if pos & BLOCK_MASK == 0:
+            # the value was the only one left in the last block
+            self.blocks[(self.head + self.nblocks - 1) & mask] = None
+            self.nblocks -= 1
+        return value
+
+    def first(self) -> Any:
+        return self[0] if self.size else None
+
+    def last(self) -> Any:
+        return self[-1] if self.size else None
+
+    def clear(self) -> None:
+        self.__init__(self.maxlen)
+
+    def rotate(self, k: int = 1) -> None:
+        """
+        Rotate k steps to the right (left if k is negative), like
+        `deque.rotate`: values move one at a time from one end to the other,
+        in whichever direction takes fewer moves. Each move deletes before it
+        adds, so maxlen never drops a value.
+        """
+        if self.size < 2:
+            return
+        k %= self.size
+        if k <= self.size // 2:
+            for _ in range(k):
+                self.add_first(self.delete_last())
+        else:
+            for _ in range(self.size - k):
+                self.add_last(self.delete_first())
+
+    def _locate(self, i: int) -> tuple[list, int]:
+        """The block holding value i, and the value's slot in it"""
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError('deque index out of range')
+        pos = self.start + i
+        return self.blocks[(self.head + (pos >> BLOCK_SHIFT)) & (len(self.blocks) - 1)], pos & BLOCK_MASK
+
+    def _grow(self) -> None:
+        """Double the ring of blocks, moving the blocks in use to its start"""
+        mask = len(self.blocks) - 1
+        in_use = [self.blocks[(self.head + b) & mask] for b in range(self.nblocks)]
+        self.blocks = in_use + [None] * (len(self.blocks) * 2 - self.nblocks)
+        self.head = 0
+
+
+if __name__ == '__main__':
+    array_deque = ArrayDeque()
+    for value in (1, 2):
+        array_deque.add_last(value)
+    array_deque.add_first(3)
+    array_deque.add_first(4)
+    array_deque.add_last(5)
+    print(array_deque, array_deque.first(), array_deque.last())  # [4->3->1->2->5] 4 5
+    print(array_deque[2], array_deque[-1])  # 1 5
+    print(array_deque.delete_first(), array_deque.delete_last(), array_deque)  # 4 5 [3->1->2]
+    array_deque.rotate(1)
+    print(array_deque, list(reversed(array_deque)))  # [2->3->1] [1, 3, 2]
+
+    window = ArrayDeque(maxlen=3)
+    for value in range(5):
+        window.add_last(value)
+    print(window)  # [2->3->4]
+
+    # memory per value and throughput over n values: add at both ends, read
+    # every value by index, then delete from both ends. The linked Deque has
+    # no indexing: reaching value i is a walk from the head, timed for 100
+    # values only.
+    def linked_index(d: Deque, i: int):
+        curr = d.head
+        for _ in range(i):
+            curr = curr.next
+        return curr.val
+
+    n = 10 ** 6
+    linked = Deque()
+    array_deque = ArrayDeque()
+    builtin = deque()
+    structures = {
+        # name: (deque, add_first, add_last, delete_first, delete_last, value at i)
+        'Deque (linked)': (
+            linked, lambda i: linked.add_first(i, i), lambda i: linked.add_last(i, i),
+            linked.delete_first, linked.delete_last, lambda i: linked_index(linked, i),
+        ),
+        'ArrayDeque': (
+            array_deque, array_deque.add_first, array_deque.add_last,
+            array_deque.delete_first, array_deque.delete_last, array_deque.__getitem__,
+        ),
+        'collections.deque': (
+            builtin, builtin.appendleft, builtin.append,
+            builtin.popleft, builtin.pop, builtin.__getitem__,
+        ),
+    }
+    for name, (d, add_first, add_last, delete_first, delete_last, value_at) in structures.items():
+        def add():
+            for i in range(n // 2):
+                add_last(i)
+                add_first(i)
+
+        def delete():
+            for _ in range(n // 2):
+                delete_first()
+                delete_last()
+
+        t_add = timed(add)
+        step = n // 100 if d is linked else 1
+        t_index = timed(lambda: [value_at(i) for i in range(0, n, step)]) * step
+        t_delete = timed(delete)
+
+        # refill the emptied deque to measure its memory, the ints included
+        tracemalloc.start()
+        add()
+        per_value = tracemalloc.get_traced_memory()[0] / n
+        tracemalloc.stop()
+        print(f'{name:17} {per_value:5.1f} bytes per value, add {n / t_add:11,.0f}/s, '
+              f'index {n / t_index:12,.0f}/s, delete {n / t_delete:11,.0f}/s')
+
+    # Deque (linked)     80.0 bytes per value, add   2,411,443/s, index           73/s, delete   4,034,088/s
+    # ArrayDeque         24.9 bytes per value, add   3,627,351/s, index    2,989,113/s, delete   3,989,825/s
+    # collections.deque  24.2 bytes per value, add  26,453,945/s, index       71,604/s, delete  27,532,638/s
+    #
+    # a block of 64 slots costs about 8 bytes per value against a DoublyNode
+    # per value, the rest being the int itself. collections.deque does the
+    # same in C, but walks from the nearest end to index, O(n) in the middle.
@@ -0,0 +1,244 @@
+import asyncio
+from random import Random
+from time import perf_counter
+from typing import Any
+
+from python.linked_list.node import DoublyNode
+from python.queue.doubly_linked_list_queue import DoublyLinkedListQueue
+from python.utils.errors import QueueOverflowError, QueueUnderflowError
+
+
+class AsyncQueue(DoublyLinkedListQueue):
+    """
+    DoublyLinkedListQueue for asyncio tasks: `await put()` and `await get()`
+    suspend the calling task instead of blocking the event loop.
+
+    With a `capacity`, `put` waits while the queue is full, so producers
+    cannot run ahead of the consumers (backpressure). Tasks waiting for room
+    or for a value are themselves queued, as futures, in a
+    DoublyLinkedListQueue each, and are woken one at a time in FIFO order.
+
+    `drain(max_items, max_wait)` collects a batch: it returns as soon as it
+    holds max_items values or max_wait seconds have passed, whichever comes
+    first, so a consumer can write downstream in batches without letting a
+    trickle of values wait indefinitely.
+    """
+
+    def __init__(self, capacity: int | None = None):
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity should be a positive integer')
+
+        super().__init__()
+        self.capacity = capacity
+        self.getters = DoublyLinkedListQueue()
+        self.putters = DoublyLinkedListQueue()
+
+    def __len__(self):
+        return self.size
+
+    def full(self) -> bool:
+        return self.capacity is not None and self.size >= self.capacity
+
+    async def put(self, value: Any, key: Any = None) -> None:
+        while self.full():
+            await self._wait(self.putters)
+        self.put_nowait(value, key)
+
+    def put_nowait(self, value: Any, key: Any = None) -> None:
+        if self.full():
+            raise QueueOverflowError()
+        self.enqueue(key, value)
+        if not self.getters.empty():
+            self._wake(self.getters)
+
+    async def get(self) -> Any:
+        while self.empty():
+            await self._wait(self.getters)
+        return self.get_nowait()
+
+    def get_nowait(self) -> Any:
+        if self.empty():
+            raise QueueUnderflowError()
+        value = self.dequeue()
+        if not self.putters.empty():
+            self._wake(self.putters)
+        return value
+
+    async def drain(self, max_items: int, max_wait: float) -> list[Any]:
+        """
+        Return up to max_items values, waiting at most max_wait seconds for
+        them to arrive. The batch may be empty if nothing arrived in time.
+        If drain is cancelled, the values it had taken go back to the head of
+        the queue, like `get` loses nothing when cancelled.
+        """
+        if max_items < 1:
+            raise ValueError('max_items should be a positive integer')
+
+        # (key, value) of every node taken so far, to put them back if drain
+        # is cancelled before it returns
+        batch: list[tuple[Any, Any]] = []
+        deadline = asyncio.get_running_loop().time() + max_wait
+        try:
+            async with asyncio.timeout_at(deadline):
+                while len(batch) < max_items:
+                    while self.empty():
+                        await self._wait(self.getters)
+                    for _ in range(min(max_items - len(batch), self.size)):
+                        key = self.head.key
+                        batch.append((key, self.dequeue()))
+                        if not self.putters.empty():
+                            self._wake(self.putters)
+        except TimeoutError:
+            # our own deadline: return what arrived in time
+            pass
+        except asyncio.CancelledError:
+            # cancelled from outside: the values were never handed to the
+            # caller, so they go back to the head of the queue, in order
+            self._requeue(batch)
+            raise
+        return [value for _, value in batch]
+
+    def _requeue(self, batch: list[tuple[Any, Any]]) -> None:
+        """
+        Put (key, value) pairs back at the head of the queue, in order. The
+        queue may briefly exceed its capacity if producers filled the room
+        these values left.
+        """
+        for key, value in reversed(batch):
+            node = DoublyNode(key, value)
+            if self.empty():
+                self.head = self.tail = node
+            else:
+                node.next = self.head
+                self.head.prev = self.head = node
+            self.size += 1
+            if not self.getters.empty():
+                self._wake(self.getters)
+
+    async def _wait(self, waiters: DoublyLinkedListQueue) -> None:
+        future = asyncio.get_running_loop().create_future()
+        waiters.enqueue(None, future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # if the wake-up already came, hand it to the next waiting task
+            if future.done() and not future.cancelled():
+                self._wake(waiters)
+            future.cancel()
+            raise
+
+    @staticmethod
+    def _wake(waiters: DoublyLinkedListQueue) -> None:
+        """Wake the first waiting task, skipping those cancelled meanwhile"""
+        while not waiters.empty():
+            future = waiters.dequeue()
+            if not future.done():
+                future.set_result(None)
+                return
+
+
+if __name__ == '__main__':
+    async def demo() -> None:
+        q = AsyncQueue(capacity=2)
+        await q.put(1)
+        await q.put(2)
+        print(q, q.full())  # [1->2] True
+
+        # a third put waits for room until a consumer takes a value
+        blocked = asyncio.create_task(q.put(3))
+        await asyncio.sleep(0)
+        print(blocked.done())  # False
+        print(await q.get())  # 1
+        await blocked
+        print(q)  # [2->3]
+
+        print(await q.drain(10, max_wait=0.01))  # [2, 3]: returned on max_wait
+        print(await q.drain(10, max_wait=0))  # []
+
+        # a drain cancelled from outside gives back what it had taken
+        async def put_later(value: str, delay: float) -> None:
+            await asyncio.sleep(delay)
+            await q.put(value)
+
+        tasks = [asyncio.create_task(put_later('a', 0.01)),
+                 asyncio.create_task(put_later('b', 0.02))]
+        try:
+            await asyncio.wait_for(q.drain(3, max_wait=1.0), 0.05)
+        except TimeoutError:
+            pass
+        await asyncio.gather(*tasks)
+        assert list(q) == ['a', 'b']
+        print(q)  # [a->b]
+
+    asyncio.run(demo())
+
+    # simulated producers: 5 tasks put 20 values each at random intervals
+    # through a queue of capacity 8, while one consumer drains batches of at
+    # most 16 values, waiting at most 5 ms for each
+    async def pipeline() -> list[list]:
+        q = AsyncQueue(capacity=8)
+        rng = Random(0)
+
+        async def producer(pid: int) -> None:
+            for i in range(20):
+                await asyncio.sleep(rng.random() * 0.002)
+                await q.put((pid, i))
+
+        producers = [asyncio.create_task(producer(pid)) for pid in range(5)]
+        loop = asyncio.get_running_loop()
+        batches, received = [], 0
+        while received < 100:
+            start = loop.time()
+            batch = await q.drain(16, max_wait=0.005)
+            # a batch comes back when it is full or on the deadline, not
+            # blocked until more values come; the margin allows for the
+            # deadline firing late on a loaded machine
+            assert len(batch) == 16 or loop.time() - start < 0.005 + 0.25
+            # the queue never holds more than its capacity
+            assert len(batch) <= 16 and len(q) <= 8
+            batches.append(batch)
+            received += len(batch)
+        await asyncio.gather(*producers)
+        return batches
+
+    batches = asyncio.run(pipeline())
+    values = [value for batch in batches for value in batch]
+    assert sorted(values) == [(pid, i) for pid in range(5) for i in range(20)]
+    for pid in range(5):
+        assert [i for p, i in values if p == pid] == list(range(20))
+    print(f'{len(values)} values in {len(batches)} batches, every value once and in order')
+
+    # throughput of one producer and one consumer moving n values through a
+    # queue of capacity 1024: a value per get, or batches from drain
+    async def throughput(q, n: int, batch: int) -> float:
+        async def produce():
+            for i in range(n):
+                await q.put(i)
+
+        start = perf_counter()
+        producer = asyncio.create_task(produce())
+        received = 0
+        while received < n:
+            if batch == 1:
+                await q.get()
+                received += 1
+            else:
+                received += len(await q.drain(batch, max_wait=0.001))
+        await producer
+        return n / (perf_counter() - start)
+
+    n = 200_000
+    for name, make, batch in (
+        ('asyncio.Queue get', lambda: asyncio.Queue(1024), 1),
+        ('AsyncQueue get', lambda: AsyncQueue(1024), 1),
+        ('AsyncQueue drain(256)', lambda: AsyncQueue(1024), 256),
+    ):
+        print(f'{name:22} -- {asyncio.run(throughput(make(), n, batch)):10,.0f} values/sec')
+
+    # asyncio.Queue get      --    761,601 values/sec
+    # AsyncQueue get         --    629,954 values/sec
+    # AsyncQueue drain(256)  --    851,417 values/sec
+    #
+    # asyncio.Queue stores values in a C deque rather than in linked nodes;
+    # draining in batches saves a task switch per value and more than makes
+    # up for it. Timings vary from run to run.
@@ -0,0 +1,225 @@
+import queue
+from random import Random
+from threading import Condition, Lock, Thread
+from typing import Any
+
+from python.queue.ring_buffer_queue import RingBufferQueue
+from python.utils.benchmark import timed
+from python.utils.errors import QueueOverflowError, QueueUnderflowError
+
+
+class BlockingQueue:
+    """
+    Thread-safe FIFO queue for producer and consumer threads, on top of a
+    RingBufferQueue guarded by one lock.
+
+    With a `capacity`, `put` waits while the queue is full, so producers
+    that run ahead of the consumers are slowed down to their pace instead of
+    growing the queue (backpressure). `get` waits while the queue is empty.
+    Both accept a `timeout` in seconds and raise QueueOverflowError or
+    QueueUnderflowError when it runs out, or straight away with `block=False`.
+
+    `get_many(n)` takes up to n values for a single acquisition of the lock,
+    and `task_done(n)` marks several values as processed at once: `join`
+    returns when every value put has been marked.
+    """
+
+    def __init__(self, capacity: int | None = None):
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity should be a positive integer')
+
+        self.buffer = RingBufferQueue(capacity or 8, bounded=capacity is not None)
+        self.mutex = Lock()
+        # the three conditions share the lock: waiting on one releases it
+        self.not_empty = Condition(self.mutex)
+        self.not_full = Condition(self.mutex)
+        self.all_tasks_done = Condition(self.mutex)
+        self.unfinished_tasks = 0
+
+    def __len__(self):
+        """Return the number of values in the queue, which other threads may change"""
+        with self.mutex:
+            return len(self.buffer)
+
+    def empty(self) -> bool:
+        with self.mutex:
+            return self.buffer.is_empty()
+
+    def full(self) -> bool:
+        with self.mutex:
+            return self.buffer.bounded and self.buffer.is_full()
+
+    def put(self, value: Any, block: bool = True, timeout: float | None = None) -> None:
+        with self.not_full:
+            if self.buffer.bounded and self.buffer.is_full():
+                self._wait(self.not_full, lambda: not self.buffer.is_full(), block, timeout, QueueOverflowError)
+            self.buffer.enqueue(value)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def put_nowait(self, value: Any) -> None:
+        self.put(value, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        with self.not_empty:
+            if not self.buffer.size:
+                self._wait(self.not_empty, lambda: self.buffer.size, block, timeout, QueueUnderflowError)
+            value = self.buffer.dequeue()
+            self.not_full.notify()
+            return value
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def get_many(self, n: int, block: bool = True, timeout: float | None = None) -> list[Any]:
+        """
+        Wait, like `get`, until the queue has a value, then remove and return
+        up to n values without releasing the lock in between
+        """
+        if n < 1:
+            raise ValueError('n should be a positive integer')
+
+        with self.not_empty:
+            if not self.buffer.size:
+                self._wait(self.not_empty, lambda: self.buffer.size, block, timeout, QueueUnderflowError)
+            buffer = self.buffer
+            values = [buffer.dequeue() for _ in range(min(n, buffer.size))]
+            self.not_full.notify(len(values))
+            return values
+
+    def task_done(self, n: int = 1) -> None:
+        """Mark n of the values taken from the queue as processed"""
+        with self.all_tasks_done:
+            unfinished = self.unfinished_tasks - n
+            if unfinished < 0:
+                raise ValueError('task_done() called too many times')
+            self.unfinished_tasks = unfinished
+            if not unfinished:
+                self.all_tasks_done.notify_all()
+
+    def join(self) -> None:
+        """Block until every value put in the queue has been marked done"""
+        with self.all_tasks_done:
+            self.all_tasks_done.wait_for(lambda: not self.unfinished_tasks)
+
+    @staticmethod
+    def _wait(
+        condition: Condition,
+        predicate,
+        block: bool,
+        timeout: float | None,
+        error: type[Exception]
+    ) -> None:
+        """Wait on condition, with its lock held, until predicate is true, or raise error"""
+        if not block:
+            raise error()
+        if timeout is not None and timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number")
+        if not condition.wait_for(predicate, timeout):
+            raise error()
+
+
+if __name__ == '__main__':
+    bq = BlockingQueue(2)
+    bq.put(1)
+    bq.put_nowait(2)
+    print(len(bq), bq.full())  # 2 True
+    try:
+        bq.put(3, timeout=0.01)
+    except QueueOverflowError:
+        print('full')  # full
+    print(bq.get_many(10), bq.empty())  # [1, 2] True
+    try:
+        bq.get_nowait()
+    except QueueUnderflowError:
+        print('empty')  # empty
+    bq.task_done(2)
+    bq.join()  # returns at once: both values were marked done
+
+    # stress test: producers put tagged values through a small queue, so they
+    # keep blocking on backpressure, while consumers take them in batches of
+    # random sizes. Every value must come out exactly once, and each
+    # producer's values in the order they were put.
+    def producer(q: BlockingQueue, pid: int, n: int) -> None:
+        for i in range(n):
+            q.put((pid, i))
+
+    def consumer(q: BlockingQueue, seed: int, out: list) -> None:
+        rng = Random(seed)
+        while True:
+            values = q.get_many(rng.randint(1, 16))
+            q.task_done(len(values))
+            stops = values.count(None)
+            if stops:
+                # one stop value per consumer: hand back the ones for the others
+                for _ in range(stops - 1):
+                    q.put(None)
+                out.extend(value for value in values if value is not None)
+                return
+            out.extend(values)
+
+    producers, consumers, per_producer = 8, 8, 20_000
+    q = BlockingQueue(64)
+    outs: list[list] = [[] for _ in range(consumers)]
+    threads = [Thread(target=consumer, args=(q, c, outs[c])) for c in range(consumers)]
+    threads += [Thread(target=producer, args=(q, p, per_producer)) for p in range(producers)]
+    for t in threads:
+        t.start()
+    for t in threads[consumers:]:
+        t.join()
+    q.join()
+    for _ in range(consumers):
+        q.put(None)
+    for t in threads[:consumers]:
+        t.join()
+
+    received = [value for out in outs for value in out]
+    assert sorted(received) == [(p, i) for p in range(producers) for i in range(per_producer)]
+    for out in outs:
+        last = {}
+        for pid, i in out:
+            assert i > last.get(pid, -1)
+            last[pid] = i
+    print(f'stress test: {len(received):,} values, none lost or duplicated')
+
+    # throughput of 4 producers and 4 consumers moving n values through a
+    # queue of capacity 1024, taking one value per lock round-trip or up to 64
+    def run(q, n: int, batch: int) -> None:
+        per_thread = n // 4
+
+        def produce():
+            for i in range(per_thread):
+                q.put(i)
+
+        def consume():
+            taken = 0
+            while taken < per_thread:
+                if batch == 1:
+                    q.get()
+                    taken += 1
+                else:
+                    taken += len(q.get_many(min(batch, per_thread - taken)))
+
+        # each consumer stops after its share, leaving the others theirs
+        threads = [Thread(target=produce) for _ in range(4)] + [Thread(target=consume) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    n = 400_000
+    for name, make, batch in (
+        ('queue.Queue get', lambda: queue.Queue(1024), 1),
+        ('BlockingQueue get', lambda: BlockingQueue(1024), 1),
+        ('BlockingQueue get_many(64)', lambda: BlockingQueue(1024), 64),
+    ):
+        t = timed(run, make(), n, batch)
+        print(f'{name:27} -- {n / t:10,.0f} values/sec')
+
+    # queue.Queue get             --    438,781 values/sec
+    # BlockingQueue get           --    403,575 values/sec
+    # BlockingQueue get_many(64)  --    982,345 values/sec
+    #
+    # Threads switching on every value dominate; taking values in batches
+    # halves the lock round-trips and wake-ups per value (the producers still
+    # put one at a time). Timings vary from run to run with thread scheduling.
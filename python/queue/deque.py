@@ -31,12 +31,6 @@ class Deque(DoublyLinkedListQueue):
                 self.tail.next = None
             return node.val
 
-    def dequeue(self):
-        pass
-
-    def enqueue(self):
-        pass
-
     def last(self):
         if self.tail:
             return self.tail.val
@@ -0,0 +1,154 @@
+from collections import deque
+from typing import Any, Iterator
+
+from python.queue.array_queue import NaiveArrayQueue, StackQueue
+from python.utils.benchmark import timed
+from python.utils.errors import QueueOverflowError, QueueUnderflowError
+
+
+class RingBufferQueue:
+    """
+    Queue stored in a fixed size array used as a circle: `head` is the index
+    of the first value and the next value goes `size` slots after it, wrapping
+    around to index 0. Dequeuing only moves `head` forward, so enqueue,
+    dequeue and first are O(1) without shifting the other values, and values
+    are stored as they are, not wrapped in nodes.
+
+    A growable queue (the default) doubles its array when it is full, which
+    keeps enqueue amortized O(1). A bounded queue keeps `capacity` slots and
+    raises QueueOverflowError instead.
+    """
+
+    def __init__(self, capacity: int = 8, bounded: bool = False):
+        if capacity < 1:
+            raise ValueError('capacity should be a positive integer')
+
+        self.items: list[Any] = [None] * capacity
+        self.head = 0
+        self.size = 0
+        self.bounded = bounded
+
+    def __iter__(self) -> Iterator[Any]:
+        items, capacity = self.items, len(self.items)
+        for i in range(self.head, self.head + self.size):
+            yield items[i - capacity if i >= capacity else i]
+
+    def __len__(self):
+        """Return the number of elements in the queue."""
+        return self.size
+
+    def __str__(self):
+        return f'[{"->".join(str(value) for value in self)}]'
+
+    @property
+    def capacity(self) -> int:
+        return len(self.items)
+
+    def enqueue(self, value: Any) -> None:
+        capacity = len(self.items)
+        if self.size == capacity:
+            if self.bounded:
+                raise QueueOverflowError()
+            self._resize(capacity * 2)
+            capacity *= 2
+
+        tail = self.head + self.size
+        if tail >= capacity:
+            tail -= capacity
+        self.items[tail] = value
+        self.size += 1
+
+    def dequeue(self) -> Any:
+        if not self.size:
+            raise QueueUnderflowError()
+
+        head = self.head
+        value = self.items[head]
+        # drop the reference so the queue does not keep the value alive
+        self.items[head] = None
+        head += 1
+        self.head = 0 if head == len(self.items) else head
+        self.size -= 1
+        return value
+
+    def is_empty(self) -> bool:
+        return not self.size
+
+    def is_full(self) -> bool:
+        return self.size == len(self.items)
+
+    def first(self) -> Any:
+        return self.items[self.head] if self.size else None
+
+    def _resize(self, capacity: int) -> None:
+        """Move the values of a full queue, in order, to the start of a new array"""
+        items, head = self.items, self.head
+        self.items = items[head:] + items[:head] + [None] * (capacity - len(items))
+        self.head = 0
+
+
+if __name__ == '__main__':
+    ring = RingBufferQueue(4, bounded=True)
+    print(ring.first(), ring.is_empty())  # None True
+    for value in (5, 6, 7):
+        ring.enqueue(value)
+    print(ring.dequeue(), ring.dequeue())  # 5 6
+    for value in (8, 9, 10):  # wraps around the end of the array
+        ring.enqueue(value)
+    print(ring, ring.items, ring.head)  # [7->8->9->10] [9, 10, 7, 8] 2
+    try:
+        ring.enqueue(11)
+    except QueueOverflowError:
+        print('full')  # full
+
+    growable = RingBufferQueue(2)
+    for value in range(5):
+        growable.enqueue(value)
+    print(growable, growable.capacity)  # [0->1->2->3->4] 8
+
+    # fill a queue with n values then drain it, and keep a queue of depth 100
+    # busy for n enqueue/dequeue pairs. NaiveArrayQueue.dequeue shifts the
+    # whole list, so its drain is O(n^2).
+    class DequeQueue(deque):
+        enqueue = deque.append
+        dequeue = deque.popleft
+
+    def fill_and_drain(queue, n: int, keyed: bool) -> None:
+        for i in range(n):
+            queue.enqueue(i, i) if keyed else queue.enqueue(i)
+        for _ in range(n):
+            queue.dequeue()
+
+    def steady(queue, n: int, keyed: bool) -> None:
+        for i in range(100):
+            queue.enqueue(i, i) if keyed else queue.enqueue(i)
+        for i in range(n):
+            queue.enqueue(i, i) if keyed else queue.enqueue(i)
+            queue.dequeue()
+
+    for n in (10 ** 4, 10 ** 5, 10 ** 6):
+        for queue_cls, keyed in (
+            (NaiveArrayQueue, True),
+            (StackQueue, True),
+            (RingBufferQueue, False),
+            (DequeQueue, False),
+        ):
+            if queue_cls is NaiveArrayQueue and n > 10 ** 5:
+                continue
+            t_fill = timed(fill_and_drain, queue_cls(), n, keyed)
+            t_steady = timed(steady, queue_cls(), n, keyed)
+            print(f'{queue_cls.__name__:16} n={n:<8} fill and drain {n / t_fill:12,.0f} items/s, '
+                  f'steady {n / t_steady:12,.0f} items/s')
+        print()
+
+    # NaiveArrayQueue  n=100000   fill and drain       84,571 items/s, steady    1,798,972 items/s
+    # StackQueue       n=100000   fill and drain    1,665,536 items/s, steady    1,820,120 items/s
+    # RingBufferQueue  n=100000   fill and drain    1,498,519 items/s, steady    2,119,219 items/s
+    # DequeQueue       n=100000   fill and drain    5,690,772 items/s, steady    7,963,982 items/s
+    #
+    # StackQueue       n=1000000  fill and drain    1,665,899 items/s, steady    1,824,090 items/s
+    # RingBufferQueue  n=1000000  fill and drain    1,594,058 items/s, steady    2,306,287 items/s
+    # DequeQueue       n=1000000  fill and drain    6,015,948 items/s, steady    9,463,753 items/s
+    #
+    # The ring buffer's throughput does not depend on n, unlike the naive
+    # queue's drain. collections.deque does the same work in C.
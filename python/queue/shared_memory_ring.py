@@ -0,0 +1,250 @@
+import os
+import sys
+from multiprocessing import Process, Queue, resource_tracker, shared_memory
+from time import perf_counter
+
+from python.utils.errors import QueueOverflowError, QueueUnderflowError
+
+# layout of the shared segment: the consumer's `head` and the producer's
+# `tail` counters sit on separate 64 byte cache lines, so each side's writes
+# do not invalidate the line the other side is writing to; the capacity and
+# record size follow, for processes attaching by name, then the data
+HEAD, TAIL, CAPACITY, RECORD_SIZE = 0, 8, 16, 17
+HEADER_SIZE = 192
+
+# bytes of the length written before each variable-size payload
+LENGTH_PREFIX = 4
+
+
+class SharedMemoryRing:
+    """
+    Single-producer/single-consumer queue of byte payloads, in a ring buffer
+    placed in a `multiprocessing.shared_memory` segment that two processes
+    map: passing a payload costs two copies and no pickling, pipe or lock.
+
+    `head` and `tail` count the bytes ever dequeued and enqueued; a counter
+    modulo the capacity is a position in the ring. Only the producer writes
+    `tail` and only the consumer writes `head`, each after copying the
+    payload, so neither side needs a lock: the consumer never reads bytes
+    the producer has not published and the producer never overwrites bytes
+    the consumer has not released.
+
+    Payloads are length-prefixed by default. With `record_size`, every
+    payload must be exactly that long and is stored without a prefix.
+
+    The counters are aligned 8 byte words, which 64-bit CPUs store in one
+    go; the scheme relies on x86-64's store ordering, as CPython exposes no
+    memory barriers.
+    """
+
+    def __init__(self, name: str | None = None, capacity: int = 1 << 20, record_size: int = 0):
+        """
+        Create a ring with `capacity` bytes of data (rounded up to a power of
+        two), or attach to the existing segment `name` created by another
+        process, in which case the other arguments are read from it
+        """
+        if name is None:
+            if capacity < 1:
+                raise ValueError('capacity should be a positive integer')
+            size = 1
+            while size < capacity:
+                size <<= 1
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + size)
+            self.owner = True
+        else:
+            # the creator unlinks the segment: do not let this process track
+            # it, or its resource tracker unlinks the segment when it exits
+            if sys.version_info >= (3, 13):
+                self.shm = shared_memory.SharedMemory(name, track=False)
+            else:
+                self.shm = shared_memory.SharedMemory(name)
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            self.owner = False
+
+        self.counters = self.shm.buf[:HEADER_SIZE].cast('Q')
+        if self.owner:
+            self.counters[HEAD] = self.counters[TAIL] = 0
+            self.counters[CAPACITY] = size
+            self.counters[RECORD_SIZE] = record_size
+        self.capacity = self.counters[CAPACITY]
+        self.record_size = self.counters[RECORD_SIZE]
+        self.mask = self.capacity - 1
+        self.data = self.shm.buf[HEADER_SIZE:HEADER_SIZE + self.capacity]
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self):
+        """Return the number of bytes, length prefixes included, in the ring"""
+        return self.counters[TAIL] - self.counters[HEAD]
+
+    def close(self) -> None:
+        """Unmap the segment, and free it if this process created it"""
+        self.counters.release()
+        self.data.release()
+        self.shm.close()
+        if self.owner:
+            if sys.version_info < (3, 13):
+                # a process attached through the same resource tracker (a
+                # child, or this process) unregistered the name: unlink
+                # unregisters it again, so it must be registered
+                resource_tracker.register(self.shm._name, 'shared_memory')
+            self.shm.unlink()
+
+    def enqueue(self, payload: bytes) -> None:
+        """Copy payload into the ring. Called by the producer only."""
+        n = len(payload)
+        if self.record_size:
+            if n != self.record_size:
+                raise ValueError(f'payload should be {self.record_size} bytes long')
+            needed = n
+        else:
+            needed = n + LENGTH_PREFIX
+        if needed > self.capacity:
+            raise ValueError('payload is larger than the ring')
+
+        counters = self.counters
+        tail = counters[TAIL]
+        if tail + needed - counters[HEAD] > self.capacity:
+            raise QueueOverflowError()
+
+        if not self.record_size:
+            self._write(tail, n.to_bytes(LENGTH_PREFIX, 'little'))
+            tail += LENGTH_PREFIX
+        self._write(tail, payload)
+        # publish: the consumer may read the payload from now on
+        counters[TAIL] = tail + n
+
+    def dequeue(self) -> bytes:
+        """Remove and return the oldest payload. Called by the consumer only."""
+        head, payload = self._peek()
+        # release: the producer may overwrite these bytes from now on
+        self.counters[HEAD] = head + len(payload)
+        return payload
+
+    def first(self) -> bytes | None:
+        """Return the oldest payload without removing it, or None"""
+        if self.is_empty():
+            return None
+        return self._peek()[1]
+
+    def is_empty(self) -> bool:
+        return self.counters[HEAD] == self.counters[TAIL]
+
+    def _peek(self) -> tuple[int, bytes]:
+        """The oldest payload, and the head counter just before it"""
+        head = self.counters[HEAD]
+        if head == self.counters[TAIL]:
+            raise QueueUnderflowError()
+
+        n = self.record_size
+        if not n:
+            n = int.from_bytes(self._read(head, LENGTH_PREFIX), 'little')
+            head += LENGTH_PREFIX
+        return head, self._read(head, n)
+
+    def _write(self, pos: int, chunk: bytes) -> None:
+        """Copy chunk to counter pos, wrapping around the end of the ring"""
+        start = pos & self.mask
+        end = start + len(chunk)
+        if end <= self.capacity:
+            self.data[start:end] = chunk
+        else:
+            split = self.capacity - start
+            self.data[start:] = chunk[:split]
+            self.data[:end - self.capacity] = chunk[split:]
+
+    def _read(self, pos: int, n: int) -> bytes:
+        start = pos & self.mask
+        end = start + n
+        if end <= self.capacity:
+            return bytes(self.data[start:end])
+        return bytes(self.data[start:]) + bytes(self.data[:end - self.capacity])
+
+
+def _ring_producer(name: str, payloads: list[bytes], rounds: int) -> None:
+    with SharedMemoryRing(name) as ring:
+        for _ in range(rounds):
+            for payload in payloads:
+                while True:
+                    try:
+                        ring.enqueue(payload)
+                        break
+                    except QueueOverflowError:
+                        # the ring is full: let the consumer run
+                        os.sched_yield()
+
+
+def _queue_producer(queue: Queue, payloads: list[bytes], rounds: int) -> None:
+    for _ in range(rounds):
+        for payload in payloads:
+            queue.put(payload)
+
+
+if __name__ == '__main__':
+    with SharedMemoryRing(capacity=16) as ring:
+        print(ring.capacity, ring.is_empty(), ring.first())  # 16 True None
+        ring.enqueue(b'hello')
+        print(len(ring), ring.first())  # 9 b'hello': 4 length bytes and 5 payload bytes
+        try:
+            ring.enqueue(b'ring')  # 8 more bytes do not fit in 16
+        except QueueOverflowError:
+            print('full')  # full
+        print(ring.dequeue(), ring.is_empty())  # b'hello' True
+        ring.enqueue(b'wraps around')  # crosses the end of the data
+        print(ring.dequeue())  # b'wraps around'
+
+        # another handle on the same segment, as a second process would open
+        with SharedMemoryRing(ring.name) as other:
+            ring.enqueue(b'shared')
+            print(other.dequeue())  # b'shared'
+
+    with SharedMemoryRing(capacity=64, record_size=8) as records:
+        for i in range(3):
+            records.enqueue(i.to_bytes(8, 'little'))
+        print(len(records), [int.from_bytes(records.dequeue(), 'little') for _ in range(3)])  # 24 [0, 1, 2]
+
+    # a producer process sends n payloads to this process, through the ring
+    # and through a multiprocessing.Queue. The payloads differ, so the
+    # consumer checks every one arrived intact and in order.
+    n = 200_000
+    for size in (16, 256, 4096):
+        payloads = [i.to_bytes(4, 'little') * (size // 4) for i in range(1000)]
+        rounds = n // len(payloads)
+
+        with SharedMemoryRing(capacity=1 << 20) as ring:
+            producer = Process(target=_ring_producer, args=(ring.name, payloads, rounds))
+            start = perf_counter()
+            producer.start()
+            for i in range(n):
+                while ring.is_empty():
+                    os.sched_yield()
+                assert ring.dequeue() == payloads[i % len(payloads)]
+            t_ring = perf_counter() - start
+            producer.join()
+
+        queue = Queue(maxsize=(1 << 20) // size)
+        producer = Process(target=_queue_producer, args=(queue, payloads, rounds))
+        start = perf_counter()
+        producer.start()
+        for i in range(n):
+            assert queue.get() == payloads[i % len(payloads)]
+        t_queue = perf_counter() - start
+        producer.join()
+
+        print(f'{size:5} byte payloads: SharedMemoryRing {n / t_ring:10,.0f} msgs/sec, '
+              f'multiprocessing.Queue {n / t_queue:10,.0f} msgs/sec')
+
+    #    16 byte payloads: SharedMemoryRing    331,237 msgs/sec, multiprocessing.Queue     80,237 msgs/sec
+    #   256 byte payloads: SharedMemoryRing    453,317 msgs/sec, multiprocessing.Queue     89,368 msgs/sec
+    #  4096 byte payloads: SharedMemoryRing    231,870 msgs/sec, multiprocessing.Queue     55,002 msgs/sec
+    #
+    # measured on a single CPU, where the side that finds the ring empty or
+    # full yields to the other; with a core per process they run in parallel.
@@ -0,0 +1,211 @@
+from random import Random
+from time import monotonic
+from typing import Any, Sequence
+
+from python.queue.array_deque import ArrayDeque
+from python.queue.deque import Deque
+from python.utils.benchmark import timed
+from python.utils.errors import QueueUnderflowError
+
+
+class SlidingWindow:
+    """
+    Minimum and maximum of the last values of a stream: the last `size`
+    values (count window) or those pushed in the last `span` seconds (time
+    window).
+
+    Instead of the whole window, two monotonic Deques keep the only values
+    that can still become its maximum or minimum. `maxes` holds values in
+    decreasing order: a new value first drops from the tail every value not
+    greater than itself, which are older and so will leave the window
+    before it. `mins` is the same in increasing order. The answers are then
+    at the heads, and each value is added and deleted at most once per
+    Deque, so `push` and `evict` are amortized O(1) and `window_max` and
+    `window_min` O(1).
+
+    Nodes are keyed by the value's sequence number, telling when the head
+    leaves the window. A time window also keeps the timestamps of the values
+    in it, in an ArrayDeque, to know how many values have expired.
+    """
+
+    def __init__(self, size: int | None = None, span: float | None = None):
+        if (size is None) == (span is None):
+            raise ValueError('pass either a size or a span')
+        if size is not None and size < 1:
+            raise ValueError('size should be a positive integer')
+        if span is not None and span <= 0:
+            raise ValueError('span should be a positive number')
+
+        self.size = size
+        self.span = span
+        self.maxes = Deque()
+        self.mins = Deque()
+        self.times = ArrayDeque() if span is not None else None
+        # sequence numbers of the next value pushed and of the oldest value
+        # still in the window
+        self.count = 0
+        self.start = 0
+
+    def __len__(self):
+        return self.count - self.start
+
+    def empty(self) -> bool:
+        return self.count == self.start
+
+    def push(self, value: Any, timestamp: float | None = None) -> None:
+        """
+        Add value to the window, evicting the values that fall out of it. In
+        a time window, timestamp defaults to `time.monotonic()` and may not
+        go back in time.
+        """
+        if self.times is not None:
+            if timestamp is None:
+                timestamp = monotonic()
+            elif self.times.size and timestamp < self.times.last():
+                raise ValueError('timestamps should not decrease')
+            self.times.add_last(timestamp)
+
+        maxes, mins = self.maxes, self.mins
+        while maxes.tail is not None and maxes.tail.val <= value:
+            maxes.delete_last()
+        maxes.add_last(self.count, value)
+        while mins.tail is not None and mins.tail.val >= value:
+            mins.delete_last()
+        mins.add_last(self.count, value)
+        self.count += 1
+
+        if self.size is not None:
+            if self.count - self.start > self.size:
+                self.evict()
+        else:
+            self.expire(timestamp)
+
+    def evict(self) -> None:
+        """Remove the oldest value from the window"""
+        if self.count == self.start:
+            raise QueueUnderflowError()
+
+        oldest = self.start
+        self.start += 1
+        if self.times is not None:
+            self.times.delete_first()
+        # sequence numbers are unique: only a head can be the oldest value
+        if self.maxes.head.key == oldest:
+            self.maxes.delete_first()
+        if self.mins.head.key == oldest:
+            self.mins.delete_first()
+
+    def expire(self, now: float | None = None) -> None:
+        """Evict the values pushed `span` seconds or more before now"""
+        if self.times is None:
+            raise ValueError('only a time window expires')
+        if now is None:
+            now = monotonic()
+        times, cutoff = self.times, now - self.span
+        while times.size and times.first() <= cutoff:
+            self.evict()
+
+    def window_max(self) -> Any:
+        return self.maxes.head.val if self.maxes.head else None
+
+    def window_min(self) -> Any:
+        return self.mins.head.val if self.mins.head else None
+
+
+def rolling_max(seq: Sequence, k: int) -> list:
+    """
+    Return the maximum of every k consecutive values of seq, in one pass.
+
+    The batch version of SlidingWindow's `maxes`: the monotonic deque holds
+    indexes into seq, in a list preallocated to n and used from both ends,
+    so no node or deque method is involved per value.
+    """
+    if k < 1:
+        raise ValueError('k should be a positive integer')
+
+    n = len(seq)
+    if k > n:
+        return []
+    out = [None] * (n - k + 1)
+    window = [0] * n
+    head, tail = 0, -1
+    for i in range(n):
+        value = seq[i]
+        while tail >= head and seq[window[tail]] <= value:
+            tail -= 1
+        tail += 1
+        window[tail] = i
+        if window[head] <= i - k:
+            head += 1
+        if i >= k - 1:
+            out[i - k + 1] = seq[window[head]]
+    return out
+
+
+if __name__ == '__main__':
+    counts = SlidingWindow(size=3)
+    for value in (4, 2, 12, 3, 1, 5):
+        counts.push(value)
+        print(value, counts.window_min(), counts.window_max(), len(counts))
+    # 4 4 4 1
+    # 2 2 4 2
+    # 12 2 12 3
+    # 3 2 12 3
+    # 1 1 12 3
+    # 5 1 5 3
+    counts.evict()
+    print(counts.window_min(), counts.window_max(), len(counts))  # 1 5 2
+
+    # a time window of 10 seconds, with explicit timestamps
+    times = SlidingWindow(span=10)
+    for t, value in ((0, 7), (4, 3), (9, 5), (12, 4)):
+        times.push(value, timestamp=t)
+    print(times.window_min(), times.window_max(), len(times))  # 3 5 3: 7 expired at t=10
+    times.expire(now=19)
+    print(times.window_min(), times.window_max(), len(times))  # 4 4 1
+    times.expire(now=30)
+    print(times.window_max(), times.empty())  # None True
+
+    print(rolling_max([1, 3, -1, -3, 5, 3, 6, 7], 3))  # [3, 3, 5, 5, 6, 7]
+
+    # check both against the window recomputed from scratch at every step
+    rng = Random(0)
+    seq = [rng.randint(0, 50) for _ in range(5000)]
+    for k in (1, 2, 7, 100):
+        window = SlidingWindow(size=k)
+        for i, value in enumerate(seq):
+            window.push(value)
+            last = seq[max(0, i - k + 1):i + 1]
+            assert (window.window_min(), window.window_max()) == (min(last), max(last))
+        assert rolling_max(seq, k) == [max(seq[i:i + k]) for i in range(len(seq) - k + 1)]
+
+    # rolling maximum of n random values: the naive O(nk) max over every
+    # window (in C) against the O(n) single pass, and a SlidingWindow fed
+    # one value at a time
+    def naive_rolling_max(seq: Sequence, k: int) -> list:
+        return [max(seq[i:i + k]) for i in range(len(seq) - k + 1)]
+
+    def stream_max(seq: Sequence, k: int) -> list:
+        window = SlidingWindow(size=k)
+        out = []
+        for value in seq:
+            window.push(value)
+            out.append(window.window_max())
+        return out[k - 1:]
+
+    n = 10 ** 5
+    seq = [rng.random() for _ in range(n)]
+    for k in (10, 100, 1000):
+        results = {
+            name: timed(func, seq, k)
+            for name, func in (('naive', naive_rolling_max), ('rolling_max', rolling_max), ('SlidingWindow', stream_max))
+        }
+        print(f'k={k:<5}', ', '.join(f'{name} {n / t:11,.0f} values/sec' for name, t in results.items()))
+
+    # k=10    naive   1,912,647 values/sec, rolling_max   2,226,181 values/sec, SlidingWindow     370,226 values/sec
+    # k=100   naive     477,075 values/sec, rolling_max   2,307,235 values/sec, SlidingWindow     388,340 values/sec
+    # k=1000  naive      54,903 values/sec, rolling_max   2,349,045 values/sec, SlidingWindow     376,935 values/sec
+    #
+    # the naive scan slows down linearly with k, even with max running in C,
+    # while one pass costs the same for any k. SlidingWindow pays for a node
+    # per value in each Deque, and for answering after every push.
@@ -0,0 +1,204 @@
+import sys
+from typing import Iterable, Iterator, Self
+
+from python.set.dynamic_array_set import DynamicArraySet
+from python.utils.benchmark import timed
+
+
+class DynamicBitSet(DynamicArraySet):
+    """
+    DynamicArraySet for dense, non-negative ints: value `v` is stored as bit
+    `v & 7` of byte `v >> 3` in a single `bytearray`, so membership costs one
+    bit per possible value instead of a pointer to a boxed int in a bucket.
+
+    Set algebra converts the byte arrays to Python ints and lets `|`, `&`,
+    `^` and `& ~` combine them in C a machine word at a time. The count of a
+    result is its popcount (`int.bit_count`), and `len()` returns the count.
+    """
+
+    def __init__(self, size: int = 64, growth_factor: float = 2.0) -> None:
+        """`size` is the number of values (bits) to allocate up front"""
+        if size < 0:
+            raise ValueError('size should be a positive integer')
+        if growth_factor <= 1:
+            raise ValueError('growth_factor should be greater than 1')
+
+        self.growth_factor = growth_factor
+        self.store = bytearray((size + 7) >> 3)
+        self.n = 0
+
+    def contains(self, value: int) -> bool:
+        idx = value >> 3
+        return 0 <= idx < len(self.store) and bool(self.store[idx] & 1 << (value & 7))
+
+    __contains__ = contains
+
+    def __iter__(self) -> Iterator[int]:
+        return self.elements()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.store)
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(size: {self.size}, count: {self.n}' \
+               f', store: {self.store.hex()})'
+
+    @property
+    def size(self) -> int:
+        """Number of values the bit array can hold without growing"""
+        return len(self.store) << 3
+
+    def elements(self) -> Iterator[int]:
+        """Yield the members in ascending order"""
+        for idx, byte in enumerate(self.store):
+            if byte:
+                base = idx << 3
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield base + bit
+
+    def add(self, value: int) -> bool:
+        if value < 0:
+            raise ValueError(f'{self.__class__.__name__} only stores non-negative integers')
+
+        idx, bit = value >> 3, 1 << (value & 7)
+        if idx >= len(self.store):
+            self._resize(max(value + 1, int(self.size * self.growth_factor)))
+        if self.store[idx] & bit:
+            return False
+        self.store[idx] |= bit
+        self.n += 1
+        return True
+
+    def discard(self, value: int) -> bool:
+        if not self.contains(value):
+            return False
+        self.store[value >> 3] &= ~(1 << (value & 7)) & 0xFF
+        self.n -= 1
+        return True
+
+    def copy(self) -> Self:
+        new = self._empty()
+        new.store = self.store[:]
+        new.n = self.n
+        return new
+
+    def _resize(self, size: int | None = None) -> None:
+        """Grow the bit array (zero filled) to hold values below `size`"""
+        if size is None:
+            size = int(self.size * self.growth_factor)
+        missing = ((size + 7) >> 3) - len(self.store)
+        if missing > 0:
+            self.store.extend(bytes(missing))
+
+    def _to_int(self) -> int:
+        return int.from_bytes(self.store, 'little')
+
+    def _set_bits(self, bits: int) -> None:
+        """Replace the contents with the members encoded by `bits`"""
+        nbytes = max(len(self.store), (bits.bit_length() + 7) >> 3)
+        self.store = bytearray(bits.to_bytes(nbytes, 'little'))
+        self.n = bits.bit_count()
+
+    def _from_int(self, bits: int) -> Self:
+        result = self._empty()
+        result._set_bits(bits)
+        return result
+
+    def _bits(self, s: Iterable) -> int:
+        """The bits of `s`, loading it into a bit set first if it is not one"""
+        if isinstance(s, DynamicBitSet):
+            return s._to_int()
+        other = self._empty()
+        for e in s.elements() if isinstance(s, DynamicArraySet) else s:
+            other.add(e)
+        return other._to_int()
+
+    def difference(self, s: Iterable) -> Self:
+        return self._from_int(self._to_int() & ~self._bits(s))
+
+    __sub__ = difference
+
+    def intersection(self, s: Iterable) -> Self:
+        return self._from_int(self._to_int() & self._bits(s))
+
+    __and__ = intersection
+
+    def union(self, s: Iterable) -> Self:
+        return self._from_int(self._to_int() | self._bits(s))
+
+    __or__ = union
+
+    def symmetric_difference(self, s: Iterable) -> Self:
+        return self._from_int(self._to_int() ^ self._bits(s))
+
+    __xor__ = symmetric_difference
+
+    def issubset(self, s: Iterable) -> bool:
+        return self._to_int() & ~self._bits(s) == 0
+
+    __le__ = issubset
+
+    def isdisjoint(self, s: Iterable) -> bool:
+        return self._to_int() & self._bits(s) == 0
+
+    def __ior__(self, s: Iterable) -> Self:
+        self._set_bits(self._to_int() | self._bits(s))
+        return self
+
+    def __iand__(self, s: Iterable) -> Self:
+        self._set_bits(self._to_int() & self._bits(s))
+        return self
+
+    def __isub__(self, s: Iterable) -> Self:
+        self._set_bits(self._to_int() & ~self._bits(s))
+        return self
+
+
+if __name__ == '__main__':
+    bs1 = DynamicBitSet()
+    for i in range(0, 40, 4):
+        bs1.add(i)
+    print(bs1)  # DynamicBitSet(size: 64, count: 10, store: 1111111111000000)
+    print(repr(bs1))  # {0, 4, 8, 12, 16, 20, 24, 28, 32, 36}
+    print(len(bs1), 8 in bs1, 9 in bs1)  # 10 True False
+    bs1.add(100)
+    print(bs1.size)  # 128
+    bs1.discard(100)
+
+    bs2 = DynamicBitSet()
+    for i in range(0, 40, 6):
+        bs2.add(i)
+    print(repr(bs1 & bs2))  # {0, 12, 24, 36}
+    print(repr(bs1 | bs2))  # {0, 4, 6, 8, 12, 16, 18, 20, 24, 28, 30, 32, 36}
+    print(repr(bs1 - bs2))  # {4, 8, 16, 20, 28, 32}
+    print(repr(bs1.union([1, 2])))  # {0, 1, 2, 4, 8, 12, 16, 20, 24, 28, 32, 36}
+    print(bs1.isdisjoint([1, 2]), (bs1 & bs2) <= bs1)  # True True
+
+    # two dense id sets of 1M elements each: half of their ids overlap
+    n = 10 ** 6
+    sets = {}
+    for set_cls in (DynamicArraySet, DynamicBitSet, set):
+        a, b = set_cls(), set_cls()
+        if set_cls is not set:
+            a.reserve(2 * n)
+            b.reserve(2 * n)
+        for i in range(n):
+            a.add(i)
+            b.add(i + n // 2)
+        sets[set_cls] = (a, b)
+
+    # table bytes only: the boxed ints referenced by DynamicArraySet and set
+    # cost another 28 bytes each on top of this
+    for set_cls, (a, b) in sets.items():
+        per_el = sys.getsizeof(a) / n
+        t = timed(lambda: a & b, number=3) / 3
+        print(f'{set_cls.__name__:16} {per_el:8.3f} bytes per element, '
+              f'intersection -- {t * 1000:.2f} ms')
+
+    # DynamicArraySet   161.128 bytes per element, intersection -- 990.95 ms
+    # DynamicBitSet       0.250 bytes per element, intersection -- 0.78 ms
+    # set                33.555 bytes per element, intersection -- 39.23 ms
@@ -1,140 +1,376 @@
-from typing import Hashable, Iterable, Iterator
+import sys
+from array import array
+from typing import Hashable, Iterable, Iterator, Self, Sized
+
+from python.utils.benchmark import timed
+from python.utils.open_addressing import DELETED, EMPTY, free_slot, probe
 
 
 class DynamicArraySet:
-    def __init__(self, size: int = 4) -> None:
+    def __init__(self, size: int = 4, growth_factor: float = 2.0) -> None:
         self.n = 0
 
         if size < 0:
             raise ValueError('size should be a positive integer')
+        if growth_factor <= 1:
+            raise ValueError('growth_factor should be greater than 1')
 
+        self.growth_factor = growth_factor
         self.store = [[] for _ in range(size if size else 1)]
 
+    @staticmethod
+    def _hash(value: int) -> int:
+        """An int is its own hash; subclasses storing other values override this"""
+        return value
+
     def contains(self, value: int) -> bool:
-        if self.n == 0 or not 0 <= value % self.size <= self.size - 1:
+        if self.n == 0:
             return False
-        return value in self.store[value % self.size]
+        return value in self.store[self._hash(value) % self.size]
 
     __contains__ = contains
 
-    def __iter__(self) -> Iterator[list]:
-        return iter(self.store)
+    def __iter__(self) -> Iterator:
+        """Yield the elements, like the lists the set operations used to return"""
+        return self.elements()
 
     def __len__(self) -> int:
-        return len(self.store)
+        """Return the number of elements; `size` is the number of buckets"""
+        return self.n
 
     def __repr__(self) -> str:
-        comp = [str(e) for _ in self for e in _ if e is not None]
+        comp = [str(e) for e in self.elements()]
         return f'{{{", ".join(comp)}}}'
 
+    def __sizeof__(self) -> int:
+        """
+        Bytes used by the table itself (the elements are not counted, same as
+        `sys.getsizeof` for the built-in `set`)
+        """
+        return object.__sizeof__(self) + sys.getsizeof(self.store) + \
+            sum(sys.getsizeof(sub_list) for sub_list in self.store)
+
     def __str__(self) -> str:
         return f'{self.__class__.__name__}(size: {self.size}, count: {self.n}' \
                f', store: {self.store})'
 
     @property
     def size(self) -> int:
-        return len(self)
+        return len(self.store)
+
+    def elements(self) -> Iterator:
+        """Yield the stored elements, skipping the `None` placeholders"""
+        return (e for sub_list in self.store for e in sub_list if e is not None)
 
     def add(self, value: int) -> bool:
-        if value not in self:
-            sub_list = self.store[value % self.size]
-            for idx, el in enumerate(sub_list):
-                if el is None:
-                    sub_list[idx] = value
-                    self.n += 1
-                    return True
+        # hash once: the bucket found here is both the membership check and
+        # the insertion point
+        sub_list = self.store[self._hash(value) % self.size]
+        if value in sub_list:
+            return False
 
-            sub_list.append(value)
-            self.n += 1
+        for idx, el in enumerate(sub_list):
+            if el is None:
+                sub_list[idx] = value
+                self.n += 1
+                return True
 
-            if self.size < self.n:
-                self._resize()
+        sub_list.append(value)
+        self.n += 1
 
-            return True
-        return False
+        if self.size < self.n:
+            self._resize()
+
+        return True
 
     def discard(self, value: int) -> bool:
-        if value in self:
-            sub_list = self.store[value % self.size]
-            for idx, el in enumerate(sub_list):
-                if el == value:
-                    del sub_list[idx]
-                    self.n -= 1
-                    return True
+        sub_list = self.store[self._hash(value) % self.size]
+        for idx, el in enumerate(sub_list):
+            if el == value:
+                del sub_list[idx]
+                self.n -= 1
+                return True
         return False
 
-    def _resize(self):
-        flat_list = [e for sl in self for e in sl if e is not None]
-        alloc_memory = int((self.n >> 3) + (3 if self.n < 9 else 6))
-        self.store = [[] for _ in range(self.size + alloc_memory + 1)]
-        self.n = 0
-        for el in flat_list:
-            self.add(el)
+    def reserve(self, n: int) -> None:
+        """
+        Resize once, up front, so that `n` elements fit without any further
+        resizing. Does nothing if the set is already large enough.
+        """
+        if n > self.size:
+            self._resize(n)
 
-    def difference(self, s: Iterable) -> list:
+    def _resize(self, size: int | None = None) -> None:
+        """
+        Rehash into `size` buckets, by default `growth_factor` times the current
+        count so that resizes are geometric and `add` stays amortized O(1).
+
+        Elements are already known to be unique, so each one is appended
+        straight into its new bucket instead of going back through `add`
+        (no membership checks, one hash per element, `n` unchanged).
+        """
+        if size is None:
+            size = max(int(self.n * self.growth_factor), self.n + 1)
+
+        elements = list(self.elements())
+        self.store = store = [[] for _ in range(size)]
+        h = self._hash
+        for el in elements:
+            store[h(el) % size].append(el)
+
+    def copy(self) -> Self:
+        new = self._empty()
+        new.store = [sub_list[:] for sub_list in self.store]
+        new.n = self.n
+        return new
+
+    def _empty(self, n: int = 0) -> Self:
+        """An empty set of the same class and growth factor, with room for n elements"""
+        new = self.__class__(growth_factor=self.growth_factor)
+        new.reserve(n)
+        return new
+
+    def _coerce(self, s: Iterable) -> 'DynamicArraySet':
+        """
+        Return `s` if it is already one of these sets (O(1) membership and a
+        known count), otherwise a set of this class built from it
+        """
+        if isinstance(s, DynamicArraySet):
+            return s
+        other = self._empty(len(s) if isinstance(s, Sized) else 0)
+        for e in s:
+            other.add(e)
+        return other
+
+    def difference(self, s: Iterable) -> Self:
         """
         The set of all elements of A that are not elements of B
         Different result if swap A and B
         """
-        return [e for _ in self for e in _ if e is not None and e not in s]
-
-    def intersection(self, s: Iterable) -> list:
+        other = self._coerce(s)
+        if other.n < self.n:
+            result = self.copy()
+            for e in other.elements():
+                result.discard(e)
+            return result
+
+        result = self._empty()
+        for e in self.elements():
+            if e not in other:
+                result.add(e)
+        return result
+
+    __sub__ = difference
+
+    def intersection(self, s: Iterable) -> Self:
         """
         The intersection of two sets includes members that are present in both
         sets. Accepts any iterable.
         """
-        return [e for _ in self for e in _ if e is not None and e in s]
+        other = self._coerce(s)
+        small, large = (self, other) if self.n <= other.n else (other, self)
+        result = self._empty(small.n)
+        for e in small.elements():
+            if e in large:
+                result.add(e)
+        return result
 
     __and__ = intersection
 
-    def union(self, s: Iterable) -> list:
+    def union(self, s: Iterable) -> Self:
         """
         The union of two sets A and B is the set of elements which are in A,
         in B, or in both A and B. Accepts any iterable.
         """
-        flat_l = [e for _ in self for e in _ if e is not None]
-        other_list = [e for e in s if e not in flat_l]
-        flat_l.extend(other_list)
-        return flat_l
+        other = self._coerce(s)
+        # copy the larger operand when it can be copied as this class
+        if type(other) is type(self) and other.n > self.n:
+            result, small = other.copy(), self
+        else:
+            result, small = self.copy(), other
+        result.reserve(self.n + other.n)
+        for e in small.elements():
+            result.add(e)
+        return result
 
     __or__ = union
 
+    def symmetric_difference(self, s: Iterable) -> Self:
+        """
+        The set of elements which are in either A or B, but not in both.
+        Accepts any iterable.
+        """
+        other = self._coerce(s)
+        if type(other) is type(self) and other.n > self.n:
+            result, small = other.copy(), self
+        else:
+            result, small = self.copy(), other
+        for e in small.elements():
+            if not result.discard(e):
+                result.add(e)
+        return result
+
+    __xor__ = symmetric_difference
+
+    def issubset(self, s: Iterable) -> bool:
+        """True if every element of A is also an element of B"""
+        other = self._coerce(s)
+        if self.n > other.n:
+            return False
+        return all(e in other for e in self.elements())
+
+    __le__ = issubset
+
+    def isdisjoint(self, s: Iterable) -> bool:
+        """True if A and B have no elements in common"""
+        other = self._coerce(s)
+        small, large = (self, other) if self.n <= other.n else (other, self)
+        return not any(e in large for e in small.elements())
+
+    def __ior__(self, s: Iterable) -> Self:
+        other = self._coerce(s)
+        self.reserve(self.n + other.n)
+        for e in other.elements():
+            self.add(e)
+        return self
+
+    def __iand__(self, s: Iterable) -> Self:
+        other = self._coerce(s)
+        for e in [e for e in self.elements() if e not in other]:
+            self.discard(e)
+        return self
+
+    def __isub__(self, s: Iterable) -> Self:
+        other = self._coerce(s)
+        if other.n < self.n:
+            for e in other.elements():
+                self.discard(e)
+        else:
+            for e in [e for e in self.elements() if e in other]:
+                self.discard(e)
+        return self
+
 
 class DynamicHashSet(DynamicArraySet):
+    @staticmethod
+    def _hash(value: Hashable) -> int:
+        return hash(value)
+
+
+class CompactHashSet(DynamicHashSet):
+    """
+    DynamicHashSet without a list per bucket: elements are stored directly in
+    one flat `store` of slots and their hashes are cached in the parallel
+    `hashes` array (8 bytes per slot), so a slot costs 16 bytes instead of a
+    56+ byte list.
+
+    Collisions are resolved by open addressing, with the engine HashMap uses
+    (`open_addressing.probe`): probe the next slot until the element or an
+    empty slot is found. A discarded element leaves a
+    tombstone so probe sequences running through its slot stay intact.
+    """
+
+    MIN_SIZE = 8
+
+    def __init__(self, size: int = MIN_SIZE, growth_factor: float = 3.0) -> None:
+        if size < 0:
+            raise ValueError('size should be a positive integer')
+        # the table is resized at 2/3 full, so it has to grow past 1.5x
+        if growth_factor < 1.5:
+            raise ValueError('growth_factor should be at least 1.5')
+
+        self.growth_factor = growth_factor
+        capacity = self.MIN_SIZE
+        while capacity < size:
+            capacity <<= 1
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.store: list = [EMPTY] * capacity
+        self.hashes = array('q', bytes(8 * capacity))
+        self.n = 0
+        # live elements plus tombstones, i.e. slots that are not `EMPTY`
+        self.filled = 0
+
     def contains(self, value: Hashable) -> bool:
-        if self.n == 0 or not 0 <= hash(value) % self.size <= self.size - 1:
-            return False
-        return value in self.store[hash(value) % self.size]
+        return self._probe(value, hash(value))[1]
 
     __contains__ = contains
 
-    def add(self, value: Hashable) -> bool:
-        if value not in self:
-            sub_list = self.store[hash(value) % self.size]
-            for idx, el in enumerate(sub_list):
-                if el is None:
-                    sub_list[idx] = value
-                    self.n += 1
-                    return True
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.store) + \
+            sys.getsizeof(self.hashes)
 
-            sub_list.append(value)
-            self.n += 1
+    def __str__(self) -> str:
+        slots = ['_' if e is EMPTY or e is DELETED else repr(e) for e in self.store]
+        return f'{self.__class__.__name__}(size: {self.size}, count: {self.n}' \
+               f', store: [{", ".join(slots)}])'
 
-            if self.size < self.n:
-                self._resize()
+    def elements(self) -> Iterator:
+        return (e for e in self.store if e is not EMPTY and e is not DELETED)
 
-            return True
-        return False
+    def copy(self) -> Self:
+        new = self._empty()
+        new.store, new.hashes = self.store[:], array('q', self.hashes)
+        new.n, new.filled = self.n, self.filled
+        return new
+
+    def add(self, value: Hashable) -> bool:
+        h = hash(value)
+        idx, found = self._probe(value, h)
+        if found:
+            return False
+
+        if self.store[idx] is EMPTY:
+            self.filled += 1
+        self.store[idx] = value
+        self.hashes[idx] = h
+        self.n += 1
+
+        # keep the load factor (tombstones included) under 2/3
+        if self.filled * 3 >= self.size * 2:
+            self._resize()
+        return True
 
     def discard(self, value: Hashable) -> bool:
-        if value in self:
-            sub_list = self.store[hash(value) % self.size]
-            for idx, el in enumerate(sub_list):
-                if el == value:
-                    del sub_list[idx]
-                    self.n -= 1
-                    return True
-        return False
+        idx, found = self._probe(value, hash(value))
+        if not found:
+            return False
+        self.store[idx] = DELETED
+        self.n -= 1
+        return True
+
+    def _probe(self, value: Hashable, h: int) -> tuple[int, bool]:
+        """`(index, found)` for value: see `open_addressing.probe`"""
+        return probe(self.store, self.hashes, value, h)
+
+    def reserve(self, n: int) -> None:
+        if n * 3 >= self.size * 2:
+            self._resize(n)
+
+    def _resize(self, size: int | None = None) -> None:
+        """
+        Reallocate to the smallest power of two over `growth_factor` times the
+        live elements (or with room for `size` elements under the load factor)
+        and place them using the cached hashes, dropping the tombstones.
+        """
+        entries = [
+            (e, h) for e, h in zip(self.store, self.hashes)
+            if e is not EMPTY and e is not DELETED
+        ]
+
+        needed = int(len(entries) * self.growth_factor) if size is None else size * 3 // 2
+        capacity = self.MIN_SIZE
+        while capacity <= needed:
+            capacity <<= 1
+        self._allocate(capacity)
+
+        store, hashes = self.store, self.hashes
+        for e, h in entries:
+            idx = free_slot(store, h)
+            store[idx], hashes[idx] = e, h
+
+        self.n = self.filled = len(entries)
 
 
 if __name__ == '__main__':
@@ -181,14 +417,24 @@ if __name__ == '__main__':
     z = s1.intersection(s2)
     u = s1.union(s2)
     d = s1.difference(s2)
-    print(z)
-    print(s1 & s2)
-    print(u)
-    print(s1 | s2)
-    print(d)
-
-    print(len(z))
-    print(len(u))
+    print(repr(z))
+    print(repr(s1 & s2))
+    print(repr(u))
+    print(repr(s1 | s2))
+    print(repr(d))
+
+    print(len(z))  # 20
+    print(len(u))  # 60
+    print(len(s1 ^ s2))  # 40
+    assert sorted(z) == sorted(e for e in s1.elements() if e in s2)
+    print(z.issubset(s1), z <= s2, d.isdisjoint(s2))  # True True True
+
+    s3 = s1.copy()
+    s3 -= s2
+    assert sorted(s3.elements()) == sorted(d.elements())
+    s3 |= z
+    s3 &= s1
+    assert len(s3) == len(s1)
 
     for i in range(40):
         s1.discard(i * 4)
@@ -198,3 +444,52 @@ if __name__ == '__main__':
     for i in 'hellohey':
         hs1.add(i)
         print(hs1)
+
+    chs1 = CompactHashSet()
+    for i in 'hellohey':
+        chs1.add(i)
+    print(chs1)  # CompactHashSet(size: 8, count: 5, store: ['l', 'o', 'h', 'e', 'y', _, _, _])
+    # (slot order depends on the str hash seed)
+    print(chs1.discard('h'), chs1.discard('h'))  # True False
+    print('h' in chs1, 'e' in chs1)  # False True
+    print(sorted(chs1.union('abc')))  # ['a', 'b', 'c', 'e', 'l', 'o', 'y']
+
+    # bytes of table per element; the elements themselves are excluded for all
+    # three, so these are directly comparable
+    for n in (10 ** 3, 10 ** 4, 10 ** 5):
+        for set_cls in (DynamicHashSet, CompactHashSet, set):
+            s = set_cls()
+            for i in range(n):
+                s.add(i)
+            per_el = sys.getsizeof(s) / n
+            print(f'{set_cls.__name__:16} n={n:<8} -- {per_el:.1f} bytes per element')
+        print()
+
+    # DynamicHashSet   n=1000     -- 130.7 bytes per element
+    # CompactHashSet   n=1000     -- 34.0 bytes per element
+    # set              n=1000     -- 33.0 bytes per element
+    #
+    # DynamicHashSet   n=10000    -- 111.6 bytes per element
+    # CompactHashSet   n=10000    -- 54.1 bytes per element
+    # set              n=10000    -- 52.5 bytes per element
+    #
+    # DynamicHashSet   n=100000   -- 158.3 bytes per element
+    # CompactHashSet   n=100000   -- 86.5 bytes per element (table just resized)
+    # set              n=100000   -- 41.9 bytes per element
+
+    # bulk insert 1M ints. Before the resize rework (12.5% growth, every
+    # element re-added through `add`) this took ~23.6 seconds.
+    def bulk_insert(n: int, growth_factor: float, reserve: bool) -> None:
+        s = DynamicArraySet(growth_factor=growth_factor)
+        if reserve:
+            s.reserve(n)
+        for i in range(n):
+            s.add(i)
+
+    for growth_factor, reserve in ((1.125, False), (2.0, False), (2.0, True)):
+        t = timed(bulk_insert, 10 ** 6, growth_factor, reserve)
+        print(f'growth_factor={growth_factor:<6} reserve={reserve!s:6} -- {t:.4f} seconds')
+
+    # growth_factor=1.125  reserve=False  -- 3.1253 seconds
+    # growth_factor=2.0    reserve=False  -- 1.8034 seconds
+    # growth_factor=2.0    reserve=True   -- 1.1558 seconds
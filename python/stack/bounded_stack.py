@@ -0,0 +1,214 @@
+from random import Random
+from typing import Iterable, Iterator, TypeVar
+
+from python.stack.stack import ArrayStack
+from python.utils.benchmark import timed
+from python.utils.errors import StackOverflowError, StackUnderflowError
+
+T = TypeVar('T')
+
+
+class BoundedArrayStack(ArrayStack[T]):
+    """
+    ArrayStack of at most `capacity` items, stored in a list allocated once,
+    at full size, and never resized.
+
+    Pushing onto a full stack raises StackOverflowError, or with
+    `drop_oldest` drops the item at the bottom to make room: the list is
+    then used as a ring buffer, `bottom` being the index of the oldest item,
+    so dropping it is O(1) too.
+
+    `push_many` and `pop_many` move a batch of items with at most two slice
+    assignments, instead of a push or pop call per item, and either move the
+    whole batch or raise without changing the stack. `high_water_mark` is
+    the largest number of items the stack has held.
+    """
+
+    def __init__(self, capacity: int, drop_oldest: bool = False):
+        if capacity < 1:
+            raise ValueError('capacity should be a positive integer')
+
+        self.stack: list[T | None] = [None] * capacity
+        self.capacity = capacity
+        self.drop_oldest = drop_oldest
+        self.bottom = 0
+        self.size = 0
+        self.high_water_mark = 0
+
+    def __iter__(self) -> Iterator[T]:
+        """Yield the items from the top of the stack down"""
+        for i in reversed(range(self.bottom, self.bottom + self.size)):
+            yield self.stack[i % self.capacity]
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self) -> str:
+        return f'[{"->".join(str(item) for item in self)}]'
+
+    def push(self, el: T) -> None:
+        if self.size == self.capacity:
+            if not self.drop_oldest:
+                raise StackOverflowError()
+            # the new top takes the place of the bottom item
+            self.stack[self.bottom] = el
+            self.bottom = (self.bottom + 1) % self.capacity
+            return
+        self.stack[(self.bottom + self.size) % self.capacity] = el
+        self.size += 1
+        if self.size > self.high_water_mark:
+            self.high_water_mark = self.size
+
+    def pop(self) -> T:
+        if not self.size:
+            raise StackUnderflowError()
+        self.size -= 1
+        i = (self.bottom + self.size) % self.capacity
+        el, self.stack[i] = self.stack[i], None
+        return el
+
+    def peek(self) -> T:
+        if not self.size:
+            raise StackUnderflowError()
+        return self.stack[(self.bottom + self.size - 1) % self.capacity]
+
+    def empty(self) -> bool:
+        return self.size == 0
+
+    def full(self) -> bool:
+        return self.size == self.capacity
+
+    def push_many(self, items: Iterable[T]) -> None:
+        """Push the items in order, the last one ending on top"""
+        items = list(items)
+        n = len(items)
+        overflow = self.size + n - self.capacity
+        if overflow > 0:
+            if not self.drop_oldest:
+                raise StackOverflowError()
+            if n >= self.capacity:
+                # every item in the stack and the first pushed are dropped
+                self.stack[:] = items[n - self.capacity:]
+                self.bottom, self.size = 0, self.capacity
+                self.high_water_mark = self.capacity
+                return
+            # drop the oldest items: their slots are the next ones written
+            self.bottom = (self.bottom + overflow) % self.capacity
+            self.size -= overflow
+
+        start = (self.bottom + self.size) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self.stack[start:end] = items
+        else:
+            split = self.capacity - start
+            self.stack[start:] = items[:split]
+            self.stack[:end - self.capacity] = items[split:]
+        self.size += n
+        if self.size > self.high_water_mark:
+            self.high_water_mark = self.size
+
+    def pop_many(self, n: int) -> list[T]:
+        """Pop n items and return them in the order `pop` would, top first"""
+        if n < 0:
+            raise ValueError('n should be a non-negative integer')
+        if n > self.size:
+            raise StackUnderflowError()
+
+        self.size -= n
+        start = (self.bottom + self.size) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            items = self.stack[start:end]
+            self.stack[start:end] = [None] * n
+        else:
+            items = self.stack[start:] + self.stack[:end - self.capacity]
+            self.stack[start:] = [None] * (self.capacity - start)
+            self.stack[:end - self.capacity] = [None] * (end - self.capacity)
+        items.reverse()
+        return items
+
+
+if __name__ == '__main__':
+    stack: BoundedArrayStack[int] = BoundedArrayStack(3)
+    stack.push(1)
+    stack.push_many([2, 3])
+    print(stack, stack.full())  # [3->2->1] True
+    try:
+        stack.push(4)
+    except StackOverflowError:
+        print('overflow')  # overflow
+    print(stack.pop_many(2), stack.peek(), stack.high_water_mark)  # [3, 2] 1 3
+
+    history: BoundedArrayStack[str] = BoundedArrayStack(3, drop_oldest=True)
+    for page in ('a', 'b', 'c', 'd'):
+        history.push(page)
+    print(history)  # [d->c->b]: a was dropped
+    history.push_many(['e', 'f'])
+    print(history)  # [f->e->d]
+    print(history.pop(), history)  # f [e->d]
+    history.push_many('uvwxyz')
+    print(history, len(history))  # [z->y->x] 3
+
+    # check against a list keeping the last `capacity` items, pushing and
+    # popping batches of random sizes across the end of the ring
+    rng = Random(0)
+    for drop_oldest in (False, True):
+        stack = BoundedArrayStack(16, drop_oldest)
+        model: list[int] = []
+        for step in range(20_000):
+            n = rng.randint(0, 20)
+            if rng.random() < 0.5:
+                items = list(range(step, step + n))
+                if len(model) + n > 16 and not drop_oldest:
+                    try:
+                        stack.push_many(items)
+                    except StackOverflowError:
+                        continue
+                    raise AssertionError('push_many should have overflowed')
+                if n == 1:
+                    stack.push(items[0])
+                else:
+                    stack.push_many(items)
+                model = (model + items)[-16:]
+            elif n <= len(model):
+                expected = model[len(model) - n:][::-1]
+                popped = [stack.pop()] if n == 1 else stack.pop_many(n)
+                assert popped == expected
+                del model[len(model) - n:]
+            assert list(stack) == model[::-1]
+
+    # throughput of n items pushed then popped: one call per item, or batches
+    # of 64, on an ArrayStack, which grows its list as it goes, and on a
+    # BoundedArrayStack
+    n = 10 ** 6
+    batch = [0] * 64
+
+    def one_at_a_time(stack) -> None:
+        for i in range(n):
+            stack.push(i)
+        for _ in range(n):
+            stack.pop()
+
+    def batches(stack: BoundedArrayStack) -> None:
+        for _ in range(n // 64):
+            stack.push_many(batch)
+        for _ in range(n // 64):
+            stack.pop_many(64)
+
+    for name, func, make in (
+        ('ArrayStack push/pop', one_at_a_time, ArrayStack),
+        ('BoundedArrayStack push/pop', one_at_a_time, lambda: BoundedArrayStack(n)),
+        ('BoundedArrayStack *_many(64)', batches, lambda: BoundedArrayStack(n)),
+    ):
+        t = timed(func, make())
+        print(f'{name:29} -- {2 * n / t:12,.0f} items/sec')
+
+    # ArrayStack push/pop           --    9,214,608 items/sec
+    # BoundedArrayStack push/pop    --    3,393,730 items/sec
+    # BoundedArrayStack *_many(64)  --   51,406,592 items/sec
+    #
+    # list.append and list.pop are single C calls, while a bounded push or
+    # pop is a Python method checking the capacity and indexing the ring.
+    # In batches the copying happens in C: 64 items per call are 5 times
+    # faster than the plain ArrayStack.
@@ -0,0 +1,162 @@
+from random import Random
+from typing import Sequence
+
+from python.stack.stack import ArrayStack
+from python.utils.benchmark import timed
+
+# Each function makes one pass over seq with an ArrayStack of indexes kept
+# monotonic: before an index is pushed, the indexes whose values it settles
+# are popped, and settled for good. Every index is pushed and popped at most
+# once, so a pass is O(n), against O(n^2) for comparing every pair.
+#
+# Outputs are lists preallocated to len(seq). seq may be any indexable
+# sequence, e.g. a list, an array.array or a NumPy array.
+
+
+def next_greater(seq: Sequence) -> list[int]:
+    """For each value, the index of the next greater value after it, or -1"""
+    out = [-1] * len(seq)
+    # indexes still waiting for a greater value, their values decreasing
+    stack: ArrayStack[int] = ArrayStack()
+    for i, value in enumerate(seq):
+        while not stack.empty() and seq[stack.peek()] < value:
+            out[stack.pop()] = i
+        stack.push(i)
+    return out
+
+
+def previous_smaller(seq: Sequence) -> list[int]:
+    """For each value, the index of the last smaller value before it, or -1"""
+    out = [-1] * len(seq)
+    # candidates for the values to come, their values increasing: a value
+    # hides the earlier ones at least as large
+    stack: ArrayStack[int] = ArrayStack()
+    for i, value in enumerate(seq):
+        while not stack.empty() and seq[stack.peek()] >= value:
+            stack.pop()
+        if not stack.empty():
+            out[i] = stack.peek()
+        stack.push(i)
+    return out
+
+
+def stock_span(prices: Sequence) -> list[int]:
+    """
+    For each day, the number of consecutive days up to and including it
+    with a price no greater than that day's
+    """
+    out = [0] * len(prices)
+    # days with a price greater than every later day's so far
+    stack: ArrayStack[int] = ArrayStack()
+    for i, price in enumerate(prices):
+        while not stack.empty() and prices[stack.peek()] <= price:
+            stack.pop()
+        out[i] = i + 1 if stack.empty() else i - stack.peek()
+        stack.push(i)
+    return out
+
+
+def largest_rectangle_in_histogram(heights: Sequence) -> int:
+    """
+    The area of the largest rectangle under a histogram of bars of width 1.
+
+    The stack holds the bars whose rectangle can still extend to the right,
+    their heights increasing. A lower bar pops the higher ones: each popped
+    bar's rectangle spans from the bar below it on the stack to the current
+    bar, both excluded.
+    """
+    best = 0
+    stack: ArrayStack[int] = ArrayStack()
+    n = len(heights)
+    for i in range(n + 1):
+        # a bar of height 0 past the end pops the bars left at the end
+        height = heights[i] if i < n else 0
+        while not stack.empty() and heights[stack.peek()] >= height:
+            top = heights[stack.pop()]
+            left = -1 if stack.empty() else stack.peek()
+            best = max(best, top * (i - left - 1))
+        stack.push(i)
+    return best
+
+
+if __name__ == '__main__':
+    temps = [73, 74, 75, 71, 69, 72, 76, 73]
+    print(next_greater(temps))  # [1, 2, 6, 5, 5, 6, -1, -1]
+    print(previous_smaller(temps))  # [-1, 0, 1, -1, -1, 4, 5, 5]
+    print(stock_span([100, 80, 60, 70, 60, 75, 85]))  # [1, 1, 1, 2, 1, 4, 6]
+    print(largest_rectangle_in_histogram([2, 1, 5, 6, 2, 3]))  # 10
+
+    # the O(n^2) scans: from each index, look for the answer one by one
+    def naive_next_greater(seq: Sequence) -> list[int]:
+        n = len(seq)
+        return [next((j for j in range(i + 1, n) if seq[j] > seq[i]), -1) for i in range(n)]
+
+    def naive_previous_smaller(seq: Sequence) -> list[int]:
+        return [next((j for j in range(i - 1, -1, -1) if seq[j] < seq[i]), -1) for i in range(len(seq))]
+
+    def naive_stock_span(prices: Sequence) -> list[int]:
+        spans = []
+        for i, price in enumerate(prices):
+            j = i
+            while j >= 0 and prices[j] <= price:
+                j -= 1
+            spans.append(i - j)
+        return spans
+
+    def naive_largest_rectangle(heights: Sequence) -> int:
+        best = 0
+        for i in range(len(heights)):
+            low = heights[i]
+            for j in range(i, len(heights)):
+                low = min(low, heights[j])
+                best = max(best, low * (j - i + 1))
+        return best
+
+    functions = {
+        'next_greater': (next_greater, naive_next_greater),
+        'previous_smaller': (previous_smaller, naive_previous_smaller),
+        'stock_span': (stock_span, naive_stock_span),
+        'largest_rectangle': (largest_rectangle_in_histogram, naive_largest_rectangle),
+    }
+
+    # check against the scans, on values with many repeats
+    rng = Random(0)
+    for n in (0, 1, 2, 50, 500):
+        seq = [rng.randint(0, 10) for _ in range(n)]
+        for name, (func, naive) in functions.items():
+            assert func(seq) == naive(seq), name
+
+    # single pass at n = 10^6 against the scans at n = 10^4 (10^6 would take
+    # hours), in us per value. The scans get slower per value as n grows.
+    # Most scans answer random values within a few steps (the rectangle scan
+    # always tries every pair); sorted values are their worst case,
+    # decreasing for next_greater and previous_smaller and increasing for
+    # stock_span.
+    for label, make in (
+        ('random', lambda n: [rng.randint(0, 1000) for _ in range(n)]),
+        ('decreasing', lambda n: list(range(n, 0, -1))),
+        ('increasing', lambda n: list(range(n))),
+    ):
+        large, small = make(10 ** 6), make(10 ** 4)
+        for name, (func, naive) in functions.items():
+            t_pass = timed(func, large) / len(large)
+            t_scan = timed(naive, small) / len(small)
+            print(f'{label:10} {name:17} single pass {t_pass * 1e6:6.2f} us, O(n^2) scan {t_scan * 1e6:9.2f} us')
+
+    # random     next_greater      single pass   0.62 us, O(n^2) scan      1.52 us
+    # random     previous_smaller  single pass   0.76 us, O(n^2) scan      1.50 us
+    # random     stock_span        single pass   0.75 us, O(n^2) scan      1.12 us
+    # random     largest_rectangle single pass   0.97 us, O(n^2) scan   1083.34 us
+    # decreasing next_greater      single pass   0.39 us, O(n^2) scan    322.77 us
+    # decreasing previous_smaller  single pass   0.51 us, O(n^2) scan    326.28 us
+    # decreasing stock_span        single pass   0.50 us, O(n^2) scan      0.22 us
+    # decreasing largest_rectangle single pass   0.77 us, O(n^2) scan   1078.10 us
+    # increasing next_greater      single pass   0.50 us, O(n^2) scan      0.66 us
+    # increasing previous_smaller  single pass   0.47 us, O(n^2) scan      0.70 us
+    # increasing stock_span        single pass   0.62 us, O(n^2) scan    419.21 us
+    # increasing largest_rectangle single pass   0.89 us, O(n^2) scan   1052.02 us
+    #
+    # the single pass costs about the same per value for any input, 10^6
+    # values in about a second, a method call per push, pop and peek
+    # included; the scans' worst cases are 1000 times slower per value
+    # already at 10^4.
@@ -0,0 +1,105 @@
+import tracemalloc
+from array import array
+from typing import Iterable, TypeVar
+
+from python.stack.stack import ArrayStack, LinkedListStack
+from python.utils.benchmark import timed
+
+T = TypeVar('T', int, float)
+
+
+class TypedArrayStack(ArrayStack[T]):
+    """
+    ArrayStack of numbers stored unboxed in an `array.array`: `typecode`
+    picks the C type, e.g. 'q' for 8 byte ints or 'd' for doubles, and every
+    item takes that many bytes instead of a pointer to a Python object.
+    Pushing a value that does not fit the type raises TypeError or
+    OverflowError.
+
+    `push`, `pop`, `peek` and `empty` are ArrayStack's: the array has the
+    same append, pop and indexing methods as a list.
+
+    `snapshot()` is a memoryview of the items, bottom first, sharing the
+    array's memory instead of copying it. While a snapshot is alive the
+    array cannot be resized: push and pop raise BufferError until it is
+    released, e.g. by a `with` block.
+    """
+
+    def __init__(self, typecode: str, values: Iterable[T] = ()):
+        self.stack = array(typecode, values)
+
+    def __len__(self):
+        return len(self.stack)
+
+    @property
+    def typecode(self) -> str:
+        return self.stack.typecode
+
+    def snapshot(self) -> memoryview:
+        return memoryview(self.stack)
+
+
+if __name__ == '__main__':
+    stack: TypedArrayStack[int] = TypedArrayStack('q')
+    for value in (3, 1, 4):
+        stack.push(value)
+    print(stack.peek(), stack.pop(), len(stack))  # 4 4 2
+    try:
+        stack.push(2 ** 63)
+    except OverflowError:
+        print('does not fit in 8 bytes')  # does not fit in 8 bytes
+
+    with stack.snapshot() as view:
+        print(view.tolist(), view.itemsize, view.nbytes)  # [3, 1] 8 16
+        try:
+            stack.push(5)
+        except BufferError:
+            print('resized while viewed')  # resized while viewed
+    stack.push(5)
+    print(stack.stack)  # array('q', [3, 1, 5])
+
+    # memory and throughput of n numbers pushed then popped, boxed in a list
+    # or in a node each, or stored in an array. The numbers are computed as
+    # they are pushed, so boxed ones count towards the memory.
+    n = 10 ** 6
+    for label, make_value, typecode in (
+        ('ints', lambda i: i, 'q'),
+        ('floats', lambda i: i / 3, 'd'),
+    ):
+        for name, make, push in (
+            ('ArrayStack', ArrayStack, ArrayStack.push),
+            # LinkedListStack nodes take a key as well: push the value as both
+            ('LinkedListStack', LinkedListStack, lambda stack, value: LinkedListStack.push(stack, value, value)),
+            (f"TypedArrayStack('{typecode}')", lambda: TypedArrayStack(typecode), TypedArrayStack.push),
+        ):
+            def push_all(stack) -> None:
+                for i in range(n):
+                    push(stack, make_value(i))
+
+            def pop_all(stack) -> None:
+                for _ in range(n):
+                    stack.pop()
+
+            stack = make()
+            t = timed(push_all, stack) + timed(pop_all, stack)
+
+            tracemalloc.start()
+            stack = make()
+            push_all(stack)
+            memory = tracemalloc.get_traced_memory()[0] / n
+            tracemalloc.stop()
+            del stack
+            print(f'{label:6} {name:21} {memory:5.1f} bytes per value, push/pop {2 * n / t:11,.0f} values/sec')
+
+    # ints   ArrayStack             40.4 bytes per value, push/pop   6,171,354 values/sec
+    # ints   LinkedListStack        88.0 bytes per value, push/pop   3,022,739 values/sec
+    # ints   TypedArrayStack('q')    8.2 bytes per value, push/pop   6,920,934 values/sec
+    # floats ArrayStack             32.4 bytes per value, push/pop   8,508,418 values/sec
+    # floats LinkedListStack        80.0 bytes per value, push/pop   3,211,390 values/sec
+    # floats TypedArrayStack('d')    8.2 bytes per value, push/pop   6,506,772 values/sec
+    #
+    # the array holds 8 bytes per value where a list holds an 8 byte pointer
+    # plus the number object, and a linked stack a node as well: 4 to 10
+    # times less memory. Push and pop run at list speed, boxing or unboxing
+    # a number each time: faster for ints, slower for floats, which CPython
+    # allocates from a free list.
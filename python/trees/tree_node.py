@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Self
 
-@dataclass
+@dataclass(slots=True)
 class TreeNode:
     val: object
     right: Self | None = None
@@ -25,6 +25,6 @@ class TreeNode:
             return 0
         return 1 + max(self.left.height(), self.right.height())
 
-@dataclass
+@dataclass(slots=True)
 class BSTNode(TreeNode):
     val: int
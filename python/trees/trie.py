@@ -4,6 +4,8 @@ from string import ascii_letters  # in Python 2 one would import letters
 
 
 class TrieNode:
+    __slots__ = ('is_word', 's')
+
     def __init__(self):  # each node will have
         self.is_word = False  # 52 children -
         self.s: dict[str, TrieNode | None] = {c: None for c in ascii_letters}  # most will remain empty
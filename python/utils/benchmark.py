@@ -16,3 +16,12 @@ def benchmark(funcs: tuple[Callable, ...], values: tuple[tuple[Any, ...]]) -> No
         for func in funcs:
             benchmark_a_func(func, value)
         print()
+
+
+def timed(func: Callable, *args: Any, number: int = 1) -> float:
+    """
+    Return the number of seconds it takes to call `func(*args)` `number` times.
+    Meant for workloads too large to repeat a million times.
+    """
+
+    return Timer(lambda: func(*args)).timeit(number)
@@ -4,3 +4,11 @@ class StackOverflowError(Exception):
 
 class StackUnderflowError(Exception):
     pass
+
+
+class QueueOverflowError(Exception):
+    pass
+
+
+class QueueUnderflowError(Exception):
+    pass
@@ -0,0 +1,57 @@
+from typing import Hashable, Sequence
+
+# Open addressing engine shared by HashMap and CompactHashSet: both keep their
+# entries in a power of two list of slots, with the hash of each entry cached
+# in a parallel `hashes` sequence.
+
+# sentinels marking slots that were never used and slots whose entry was deleted
+EMPTY = object()
+DELETED = object()
+
+# mask applied to `hash()` so the probe sequence works on a non-negative value
+HASH_MASK = (1 << 64) - 1
+
+
+def probe(slots: list, hashes: Sequence[int], key: Hashable, h: int) -> tuple[int, bool]:
+    """
+    Return `(index, True)` for the slot holding `key`, otherwise
+    `(index, False)` for the slot `key` should be inserted into: the first
+    tombstone on the probe sequence, or the empty slot that ended it.
+
+    Slots are visited with the recurrence CPython's `dict` and `set` use,
+    `i = 5 * i + perturb + 1`, which visits every slot of a power of two
+    table. Terminates because the caller's load factor guarantees an
+    `EMPTY` slot.
+    """
+    mask = len(slots) - 1
+    perturb = h & HASH_MASK
+    idx = perturb & mask
+    tombstone = -1
+
+    while True:
+        k = slots[idx]
+        if k is EMPTY:
+            return (idx if tombstone < 0 else tombstone), False
+        if k is DELETED:
+            if tombstone < 0:
+                tombstone = idx
+        elif hashes[idx] == h and (k is key or k == key):
+            return idx, True
+        perturb >>= 5
+        idx = (idx * 5 + perturb + 1) & mask
+
+
+def free_slot(slots: list, h: int) -> int:
+    """
+    The first `EMPTY` slot on the probe sequence of hash h. Used to place
+    entries in a freshly allocated table when resizing: it holds no
+    tombstones and no duplicates, so no key is compared.
+    """
+    mask = len(slots) - 1
+    perturb = h & HASH_MASK
+    idx = perturb & mask
+    while slots[idx] is not EMPTY:
+        perturb >>= 5
+        idx = (idx * 5 + perturb + 1) & mask
+    return idx
+